@@ -3,14 +3,18 @@ AlphaBoard Client.
 Wrapper for AlphaBoard backend API and direct Supabase database operations.
 """
 
+import asyncio
 import logging
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union, Callable, Awaitable
 from uuid import UUID
-import httpx
 from supabase import create_client, Client as SupabaseClient
 
-from .config import Settings, get_source_from_url
+from .config import Settings, get_settings, get_source_from_url
+from .http_client import get_http_client
+from .lookup_cache import create_lookup_cache
 from .schemas import (
     WhatsAppUser,
     WatchlistItem,
@@ -26,6 +30,41 @@ class AlphaBoardClientError(Exception):
     pass
 
 
+# Phone -> WhatsApp user ID cache, shared across AlphaBoardClient instances.
+# The mapping never changes once a user exists; entries age out only to bound
+# memory and so last_active_at is still refreshed periodically.
+USER_ID_CACHE_TTL_SECONDS = 3600
+USER_ID_CACHE_MAX_SIZE = 50_000
+_user_id_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+# In-flight lookups by phone, so concurrent first messages share one query
+_user_id_pending: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+# Columns the recommendation list views render; skips thesis and other text
+RECOMMENDATION_LIST_COLUMNS = "ticker, action, status, entry_price, current_price, final_return_pct, entry_date"
+
+# Users per query when fetching watchlists in bulk (each ID adds ~40 URL bytes)
+WATCHLIST_BULK_CHUNK_SIZE = 100
+
+# WhatsApp user ID -> account link status and admin role, shared across
+# instances (and across workers when REDIS_URL is set). Kept short so profile
+# and role changes show up quickly; link and unlink evict both entries.
+ACCOUNT_STATUS_CACHE_TTL_SECONDS = 60
+ADMIN_STATUS_CACHE_TTL_SECONDS = 300
+_account_status_cache = create_lookup_cache(get_settings(), "acct:", ACCOUNT_STATUS_CACHE_TTL_SECONDS)
+_admin_status_cache = create_lookup_cache(get_settings(), "admin:", ADMIN_STATUS_CACHE_TTL_SECONDS)
+
+# Organization teams and team/organization rosters for the track-analyst
+# menus. Rosters are edited in the web app, so entries simply age out.
+ROSTER_CACHE_TTL_SECONDS = 300
+_roster_cache = create_lookup_cache(get_settings(), "roster:", ROSTER_CACHE_TTL_SECONDS)
+
+# Supabase clients by (url, service key). AlphaBoardClient is created per
+# message; reusing the client keeps its HTTP session (and TLS connection) alive
+# and runs the header patching and connection test once per process.
+_supabase_clients: Dict[Tuple[str, str], SupabaseClient] = {}
+
+
 class AlphaBoardClient:
     """
     Client for AlphaBoard backend and Supabase database.
@@ -42,22 +81,27 @@ class AlphaBoardClient:
         self.api_base_url = settings.ALPHABOARD_API_BASE_URL.rstrip("/")
         self.api_key = settings.ALPHABOARD_API_KEY
         
-        # Initialize HTTP client for AlphaBoard API calls FIRST (before Supabase)
+        # In-flight prefetch tasks keyed by (kind, analyst_user_id[, status, limit])
+        self._prefetch: Dict[Tuple[Optional[str], ...], asyncio.Task] = {}
+        
+        # Attach the shared HTTP client FIRST (before Supabase)
         # This ensures it's always available even if Supabase init fails
-        headers = {"Content-Type": "application/json"}
+        self._headers = {"Content-Type": "application/json"}
         if self.api_key:
-            headers["X-API-KEY"] = self.api_key
+            self._headers["X-API-KEY"] = self.api_key
         
-        self._http_client = httpx.AsyncClient(
-            timeout=30.0,
-            headers=headers
-        )
+        self._http_client = get_http_client()
         
         # Initialize Supabase client for direct DB access
         # Using service role key to bypass RLS
         service_key = settings.SUPABASE_SERVICE_ROLE_KEY
         self._service_key = service_key  # Store for later use in queries
         
+        cached_supabase = _supabase_clients.get((settings.SUPABASE_URL, service_key or ""))
+        if cached_supabase is not None:
+            self.supabase: SupabaseClient = cached_supabase
+            return
+        
         # Debug: Log key status (only first 10 chars for security)
         if service_key:
             key_prefix = service_key[:15] if len(service_key) > 15 else "TOO_SHORT"
@@ -83,7 +127,7 @@ class AlphaBoardClient:
             # For new secret key format, we need to pass it differently
             # The Supabase Python client expects a JWT token, but sb_secret_ format is not a JWT
             # So we'll create the client and then patch headers
-            self.supabase: SupabaseClient = create_client(
+            self.supabase = create_client(
                 settings.SUPABASE_URL,
                 service_key
             )
@@ -136,6 +180,8 @@ class AlphaBoardClient:
                         logger.error("⚠️ CRITICAL: Supabase client may not work correctly. Check SUPABASE_SERVICE_ROLE_KEY format.")
                 else:
                     logger.warning(f"⚠️ Connection test failed: {test_error}")
+            
+            _supabase_clients[(settings.SUPABASE_URL, service_key)] = self.supabase
                 
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}", exc_info=True)
@@ -312,9 +358,20 @@ class AlphaBoardClient:
             logger.error(f"Error ensuring headers are set: {e}", exc_info=True)
     
     async def close(self):
-        """Close the HTTP client."""
-        if hasattr(self, '_http_client') and self._http_client:
-            await self._http_client.aclose()
+        """Release the client. The shared HTTP client stays open for reuse."""
+        for task in self._prefetch.values():
+            task.cancel()
+        self._prefetch.clear()
+        self._http_client = None
+    
+    async def _execute(self, query):
+        """
+        Run a Supabase query builder without blocking the event loop.
+        
+        The Supabase client is synchronous, so .execute() runs in a worker
+        thread; independent lookups can then overlap under asyncio.gather.
+        """
+        return await asyncio.to_thread(query.execute)
     
     # =========================================================================
     # User Management
@@ -340,20 +397,20 @@ class AlphaBoardClient:
         
         try:
             # Try to find existing user
-            result = self.supabase.table("whatsapp_users") \
+            query = self.supabase.table("whatsapp_users") \
                 .select("*") \
-                .eq("phone", normalized_phone) \
-                .execute()
+                .eq("phone", normalized_phone)
+            result = await self._execute(query)
             
             if result.data and len(result.data) > 0:
                 user = result.data[0]
                 logger.info(f"Found existing WhatsApp user: {user['id']}")
                 
                 # Update last_active_at
-                self.supabase.table("whatsapp_users") \
+                query = self.supabase.table("whatsapp_users") \
                     .update({"last_active_at": datetime.utcnow().isoformat()}) \
-                    .eq("id", user["id"]) \
-                    .execute()
+                    .eq("id", user["id"])
+                await self._execute(query)
                 
                 return user
             
@@ -366,9 +423,9 @@ class AlphaBoardClient:
                 "last_active_at": datetime.utcnow().isoformat()
             }
             
-            result = self.supabase.table("whatsapp_users") \
-                .insert(new_user_data) \
-                .execute()
+            query = self.supabase.table("whatsapp_users") \
+                .insert(new_user_data)
+            result = await self._execute(query)
             
             if result.data and len(result.data) > 0:
                 user = result.data[0]
@@ -381,6 +438,40 @@ class AlphaBoardClient:
             logger.error(f"Error in get_or_create_user_by_phone: {e}")
             raise AlphaBoardClientError(f"Database error: {str(e)}")
     
+    async def get_user_id_by_phone(self, phone: str) -> str:
+        """
+        Resolve a phone number to its WhatsApp user ID, creating the user if needed.
+        
+        Results are cached for USER_ID_CACHE_TTL_SECONDS so an active
+        conversation does not hit the database on every message.
+        
+        Args:
+            phone: Phone number in E.164 format (with or without +)
+            
+        Returns:
+            WhatsApp user ID
+        """
+        normalized_phone = phone.lstrip("+")
+        now = time.monotonic()
+        
+        cached = _user_id_cache.get(normalized_phone)
+        if cached and now - cached[0] < USER_ID_CACHE_TTL_SECONDS:
+            return cached[1]
+        
+        pending = _user_id_pending.get(normalized_phone)
+        if pending is None:
+            pending = asyncio.ensure_future(self.get_or_create_user_by_phone(normalized_phone))
+            _user_id_pending[normalized_phone] = pending
+            pending.add_done_callback(lambda _: _user_id_pending.pop(normalized_phone, None))
+        
+        user = await asyncio.shield(pending)
+        _user_id_cache[normalized_phone] = (now, user["id"])
+        _user_id_cache.move_to_end(normalized_phone)
+        if len(_user_id_cache) > USER_ID_CACHE_MAX_SIZE:
+            _user_id_cache.popitem(last=False)
+        
+        return user["id"]
+    
     async def update_user_display_name(self, user_id: str, display_name: str) -> Dict[str, Any]:
         """
         Update user's display name.
@@ -427,6 +518,9 @@ class AlphaBoardClient:
                 .eq("id", whatsapp_user_id) \
                 .execute()
             
+            await _account_status_cache.delete(whatsapp_user_id)
+            await _admin_status_cache.delete(whatsapp_user_id)
+            
             if result.data and len(result.data) > 0:
                 return result.data[0]
             
@@ -436,6 +530,35 @@ class AlphaBoardClient:
             logger.error(f"Error linking Supabase user: {e}")
             raise AlphaBoardClientError(f"Database error: {str(e)}")
     
+    async def unlink_supabase_user(self, whatsapp_user_id: str) -> bool:
+        """
+        Unlink WhatsApp user from their AlphaBoard/Supabase user.
+        
+        The update only matches a linked row (NULL and "" both fail the
+        <> '' filter), so its result doubles as the "was it linked?" check.
+        
+        Args:
+            whatsapp_user_id: WhatsApp user ID
+            
+        Returns:
+            True if the user was linked and is now unlinked, False otherwise
+        """
+        try:
+            query = self.supabase.table("whatsapp_users") \
+                .update({
+                    "supabase_user_id": None,
+                    "onboarding_completed": False
+                }) \
+                .eq("id", whatsapp_user_id) \
+                .neq("supabase_user_id", "")
+            result = await self._execute(query)
+            await _account_status_cache.delete(whatsapp_user_id)
+            await _admin_status_cache.delete(whatsapp_user_id)
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Error unlinking Supabase user: {e}")
+            raise AlphaBoardClientError(f"Database error: {str(e)}")
+    
     # =========================================================================
     # Account Linking Operations
     # =========================================================================
@@ -554,18 +677,33 @@ class AlphaBoardClient:
         """
         Get the account linking status for a WhatsApp user.
         
+        Successful lookups are cached for ACCOUNT_STATUS_CACHE_TTL_SECONDS,
+        since most commands check the link status before doing anything else.
+        
         Args:
             whatsapp_user_id: WhatsApp user ID
             
         Returns:
             Status dict with is_linked, profile info, etc.
         """
+        cached = await _account_status_cache.get(whatsapp_user_id)
+        if cached is not None:
+            return cached
+        
+        status = await self._fetch_user_account_status(whatsapp_user_id)
+        if "error" not in status:
+            await _account_status_cache.set(whatsapp_user_id, status)
+        
+        return status
+    
+    async def _fetch_user_account_status(self, whatsapp_user_id: str) -> Dict[str, Any]:
+        """Query the account linking status for a WhatsApp user (uncached)."""
         try:
             # Fetch WhatsApp user (without join since FK was removed)
-            result = self.supabase.table("whatsapp_users") \
+            query = self.supabase.table("whatsapp_users") \
                 .select("*") \
-                .eq("id", whatsapp_user_id) \
-                .execute()
+                .eq("id", whatsapp_user_id)
+            result = await self._execute(query)
             
             if not result.data or len(result.data) == 0:
                 return {"is_linked": False, "user_found": False}
@@ -582,12 +720,7 @@ class AlphaBoardClient:
                     # Look up Supabase UUID from clerk_user_mapping
                     actual_user_id = await self._get_supabase_uuid(supabase_user_id)
                     if actual_user_id:
-                        profile_result = self.supabase.table("profiles") \
-                            .select("id, username, full_name") \
-                            .eq("id", actual_user_id) \
-                            .execute()
-                        if profile_result.data and len(profile_result.data) > 0:
-                            profile = profile_result.data[0]
+                        profile = await self.get_profile(actual_user_id) or {}
                 except Exception as profile_err:
                     logger.warning(f"Could not fetch profile: {profile_err}")
             
@@ -740,12 +873,12 @@ class AlphaBoardClient:
                 logger.warning(f"No Supabase UUID found for Clerk user ID: {supabase_user_id}")
                 return []
             
-            result = self.supabase.table("recommendations") \
+            query = self.supabase.table("recommendations") \
                 .select("*") \
                 .eq("user_id", actual_user_id) \
                 .eq("status", "WATCHLIST") \
-                .order("entry_date", desc=True) \
-                .execute()
+                .order("entry_date", desc=True)
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -770,12 +903,12 @@ class AlphaBoardClient:
                 logger.warning(f"No Supabase UUID found for Clerk user ID: {supabase_user_id}")
                 return []
             
-            result = self.supabase.table("recommendations") \
-                .select("*") \
+            query = self.supabase.table("recommendations") \
+                .select(RECOMMENDATION_LIST_COLUMNS) \
                 .eq("user_id", actual_user_id) \
                 .eq("status", "OPEN") \
-                .order("entry_date", desc=True) \
-                .execute()
+                .order("entry_date", desc=True)
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -798,13 +931,13 @@ class AlphaBoardClient:
             if not actual_user_id:
                 return []
             
-            result = self.supabase.table("recommendations") \
-                .select("*") \
+            query = self.supabase.table("recommendations") \
+                .select(RECOMMENDATION_LIST_COLUMNS) \
                 .eq("user_id", actual_user_id) \
                 .eq("status", "CLOSED") \
                 .order("exit_date", desc=True) \
-                .limit(20) \
-                .execute()
+                .limit(20)
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -823,11 +956,11 @@ class AlphaBoardClient:
             Supabase UUID string or None if not found
         """
         try:
-            result = self.supabase.table("clerk_user_mapping") \
+            query = self.supabase.table("clerk_user_mapping") \
                 .select("supabase_user_id") \
                 .eq("clerk_user_id", clerk_user_id) \
-                .limit(1) \
-                .execute()
+                .limit(1)
+            result = await self._execute(query)
             
             if result.data and len(result.data) > 0:
                 return result.data[0].get("supabase_user_id")
@@ -839,6 +972,34 @@ class AlphaBoardClient:
             logger.error(f"Error looking up Supabase UUID for Clerk ID {clerk_user_id}: {e}")
             return None
     
+    async def get_profile(
+        self,
+        profile_id: str,
+        columns: str = "id, username, full_name"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a row from public.profiles by Supabase UUID.
+        
+        Args:
+            profile_id: Supabase UUID
+            columns: Columns to select
+            
+        Returns:
+            Profile dict, or None if there is no such profile
+        """
+        try:
+            query = self.supabase.table("profiles") \
+                .select(columns) \
+                .eq("id", profile_id) \
+                .limit(1)
+            result = await self._execute(query)
+            
+            return result.data[0] if result.data else None
+            
+        except Exception as e:
+            logger.error(f"Error fetching profile {profile_id}: {e}")
+            raise AlphaBoardClientError(f"Database error: {str(e)}")
+    
     # =========================================================================
     # Watchlist Operations
     # =========================================================================
@@ -912,11 +1073,11 @@ class AlphaBoardClient:
             List of watchlist items
         """
         try:
-            result = self.supabase.table("whatsapp_watchlist") \
+            query = self.supabase.table("whatsapp_watchlist") \
                 .select("*") \
                 .eq("whatsapp_user_id", user_id) \
-                .order("created_at", desc=True) \
-                .execute()
+                .order("created_at", desc=True)
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -924,6 +1085,39 @@ class AlphaBoardClient:
             logger.error(f"Error fetching watchlist: {e}")
             raise AlphaBoardClientError(f"Database error: {str(e)}")
     
+    async def list_watchlists_bulk(self, user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the watchlists of many users at once.
+        
+        Runs one query per WATCHLIST_BULK_CHUNK_SIZE users instead of one per
+        user; chunking keeps the PostgREST `in` filter within URL length limits.
+        
+        Args:
+            user_ids: WhatsApp user IDs
+        
+        Returns:
+            Dict of user ID to watchlist items (newest first); users with an
+            empty watchlist are absent
+        """
+        watchlists: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        
+        try:
+            for start in range(0, len(user_ids), WATCHLIST_BULK_CHUNK_SIZE):
+                query = self.supabase.table("whatsapp_watchlist") \
+                    .select("*") \
+                    .in_("whatsapp_user_id", user_ids[start:start + WATCHLIST_BULK_CHUNK_SIZE]) \
+                    .order("created_at", desc=True)
+                result = await self._execute(query)
+                
+                for item in result.data or []:
+                    watchlists[item["whatsapp_user_id"]].append(item)
+            
+            return dict(watchlists)
+        
+        except Exception as e:
+            logger.error(f"Error fetching watchlists: {e}")
+            raise AlphaBoardClientError(f"Database error: {str(e)}")
+    
     async def remove_from_watchlist(self, user_id: str, ticker: str) -> bool:
         """
         Remove a stock from user's watchlist.
@@ -1074,12 +1268,12 @@ class AlphaBoardClient:
         try:
             cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
             
-            result = self.supabase.table("whatsapp_recommendations") \
+            query = self.supabase.table("whatsapp_recommendations") \
                 .select("*") \
                 .eq("whatsapp_user_id", user_id) \
                 .gte("created_at", cutoff) \
-                .order("created_at", desc=True) \
-                .execute()
+                .order("created_at", desc=True)
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -1215,7 +1409,7 @@ class AlphaBoardClient:
             
             logger.info(f"Generating podcast for {ticker} with {len(news)} news articles")
             
-            response = await self._http_client.post(url, json=payload, timeout=60.0)
+            response = await self._http_client.post(url, json=payload, headers=self._headers, timeout=60.0)
             
             if response.status_code != 200:
                 logger.error(f"Podcast API error: {response.status_code}, response: {response.text}")
@@ -1243,7 +1437,7 @@ class AlphaBoardClient:
         """
         try:
             url = f"{self.api_base_url}/market/summary/{ticker}"
-            response = await self._http_client.get(url)
+            response = await self._http_client.get(url, headers=self._headers, timeout=30.0)
             
             if response.status_code != 200:
                 logger.error(f"Stock summary API error: {response.status_code}")
@@ -1267,7 +1461,7 @@ class AlphaBoardClient:
         """
         try:
             url = f"{self.api_base_url}/market/price/{ticker}"
-            response = await self._http_client.get(url)
+            response = await self._http_client.get(url, headers=self._headers, timeout=30.0)
             
             if response.status_code != 200:
                 return None
@@ -1291,7 +1485,7 @@ class AlphaBoardClient:
         """
         try:
             url = f"{self.api_base_url}/news/{ticker}"
-            response = await self._http_client.get(url)
+            response = await self._http_client.get(url, headers=self._headers, timeout=30.0)
             
             if response.status_code != 200:
                 logger.error(f"News API error: {response.status_code}")
@@ -1481,12 +1675,12 @@ class AlphaBoardClient:
                 return []
             
             # Fetch from price_alert_triggers (user-set alerts)
-            result = self.supabase.table("price_alert_triggers") \
+            query = self.supabase.table("price_alert_triggers") \
                 .select("*") \
                 .eq("user_id", actual_user_id) \
                 .eq("is_active", True) \
-                .order("created_at", desc=True) \
-                .execute()
+                .order("created_at", desc=True)
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -1508,80 +1702,107 @@ class AlphaBoardClient:
         Returns:
             Dict with is_admin, organization_id, role
         """
+        cached = await _admin_status_cache.get(whatsapp_user_id)
+        if cached is not None:
+            return cached
+        
         try:
-            account_status = await self.get_user_account_status(whatsapp_user_id)
-            
-            if not account_status.get("is_linked") or not account_status.get("supabase_user_id"):
-                return {"is_admin": False, "reason": "Account not linked"}
-            
-            clerk_user_id = account_status["supabase_user_id"]
-            actual_user_id = await self._get_supabase_uuid(clerk_user_id)
-            
-            if not actual_user_id:
-                return {"is_admin": False, "reason": "User not found"}
-            
-            # First check user_organization_membership (source of truth for org membership)
-            membership_result = self.supabase.table("user_organization_membership") \
-                .select("organization_id, role") \
-                .eq("user_id", actual_user_id) \
-                .limit(1) \
-                .execute()
-            
-            org_id = None
-            membership_role = None
-            is_org_admin = False
-            
-            if membership_result.data and len(membership_result.data) > 0:
-                membership = membership_result.data[0]
-                org_id = membership.get("organization_id")
-                membership_role = membership.get("role")
-                is_org_admin = membership_role == "admin"
-            
-            # Get user's profile for additional info
-            profile_result = self.supabase.table("profiles") \
-                .select("id, username, role, organization_id") \
-                .eq("id", actual_user_id) \
-                    .limit(1) \
-                    .execute()
-                
-            profile = {}
-            profile_role = "analyst"
-            if profile_result.data and len(profile_result.data) > 0:
-                profile = profile_result.data[0]
-                profile_role = profile.get("role", "analyst")
-                # Sync organization_id to profile if it's missing but exists in membership
-                if not profile.get("organization_id") and org_id:
-                    try:
-                        self.supabase.table("profiles") \
-                            .update({"organization_id": org_id}) \
-                            .eq("id", actual_user_id) \
-                            .execute()
-                        logger.info(f"Synced organization_id {org_id} to profile for user {actual_user_id}")
-                    except Exception as sync_err:
-                        logger.warning(f"Could not sync organization_id to profile: {sync_err}")
-            
-            # Admin = manager role in profile OR admin role in membership
-            is_admin = profile_role == "manager" or is_org_admin
-            
-            # Use org_id from membership if available, fallback to profile
-            if not org_id:
-                org_id = profile.get("organization_id")
-            
-            return {
-                "is_admin": is_admin,
-                "role": membership_role or profile_role,
-                "organization_id": org_id,
-                "user_id": actual_user_id,
-                "username": profile.get("username")
-            }
-            
+            admin_status = await self._fetch_admin_status(whatsapp_user_id)
         except Exception as e:
             logger.error(f"Error checking admin status: {e}")
             return {"is_admin": False, "reason": str(e)}
+        
+        await _admin_status_cache.set(whatsapp_user_id, admin_status)
+        return admin_status
+    
+    async def _fetch_admin_status(self, whatsapp_user_id: str) -> Dict[str, Any]:
+        """Query the admin role for a WhatsApp user (uncached; raises on error)."""
+        account_status = await self.get_user_account_status(whatsapp_user_id)
+        
+        # A failed status lookup must not be cached as "not linked"
+        if "error" in account_status:
+            raise AlphaBoardClientError(account_status["error"])
+        
+        if not account_status.get("is_linked") or not account_status.get("supabase_user_id"):
+            return {"is_admin": False, "reason": "Account not linked"}
+        
+        clerk_user_id = account_status["supabase_user_id"]
+        actual_user_id = await self._get_supabase_uuid(clerk_user_id)
+        
+        if not actual_user_id:
+            return {"is_admin": False, "reason": "User not found"}
+        
+        # First check user_organization_membership (source of truth for org membership)
+        membership_query = self.supabase.table("user_organization_membership") \
+            .select("organization_id, role") \
+            .eq("user_id", actual_user_id) \
+            .limit(1)
+        membership_result = await self._execute(membership_query)
+        
+        org_id = None
+        membership_role = None
+        is_org_admin = False
+        
+        if membership_result.data and len(membership_result.data) > 0:
+            membership = membership_result.data[0]
+            org_id = membership.get("organization_id")
+            membership_role = membership.get("role")
+            is_org_admin = membership_role == "admin"
+        
+        # Get user's profile for additional info
+        profile = await self.get_profile(actual_user_id, "id, username, role, organization_id") or {}
+        profile_role = "analyst"
+        if profile:
+            profile_role = profile.get("role", "analyst")
+            # Sync organization_id to profile if it's missing but exists in membership
+            if not profile.get("organization_id") and org_id:
+                try:
+                    self.supabase.table("profiles") \
+                        .update({"organization_id": org_id}) \
+                        .eq("id", actual_user_id) \
+                        .execute()
+                    logger.info(f"Synced organization_id {org_id} to profile for user {actual_user_id}")
+                except Exception as sync_err:
+                    logger.warning(f"Could not sync organization_id to profile: {sync_err}")
+        
+        # Admin = manager role in profile OR admin role in membership
+        is_admin = profile_role == "manager" or is_org_admin
+        
+        # Use org_id from membership if available, fallback to profile
+        if not org_id:
+            org_id = profile.get("organization_id")
+        
+        return {
+            "is_admin": is_admin,
+            "role": membership_role or profile_role,
+            "organization_id": org_id,
+            "user_id": actual_user_id,
+            "username": profile.get("username")
+        }
+    
+    async def _cached_roster(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Return a roster list from the roster cache, fetching it on a miss.
+        
+        Empty results are not cached, since the fetchers also return an
+        empty list on error.
+        """
+        cached = await _roster_cache.get(key)
+        if cached is not None:
+            return cached["rows"]
+        
+        rows = await fetch()
+        if rows:
+            await _roster_cache.set(key, {"rows": rows})
+        return rows
     
     async def get_organization_teams(self, organization_id: str) -> List[Dict[str, Any]]:
         """
-        Get all teams in an organization.
+        Get all teams in an organization (cached for ROSTER_CACHE_TTL_SECONDS).
         
         Args:
             organization_id: Organization UUID
@@ -1589,12 +1810,19 @@ class AlphaBoardClient:
         Returns:
             List of teams
         """
+        return await self._cached_roster(
+            f"teams:{organization_id}",
+            lambda: self._fetch_organization_teams(organization_id)
+        )
+    
+    async def _fetch_organization_teams(self, organization_id: str) -> List[Dict[str, Any]]:
+        """Query the teams in an organization (see get_organization_teams)."""
         try:
-            result = self.supabase.table("teams") \
+            query = self.supabase.table("teams") \
                 .select("id, name") \
                 .eq("org_id", organization_id) \
-                .order("name") \
-                .execute()
+                .order("name")
+            result = await self._execute(query)
             
             return result.data if result.data else []
             
@@ -1604,7 +1832,7 @@ class AlphaBoardClient:
     
     async def get_team_members(self, team_id: str) -> List[Dict[str, Any]]:
         """
-        Get all members of a team with their profiles.
+        Get all members of a team with their profiles (cached for ROSTER_CACHE_TTL_SECONDS).
         
         Args:
             team_id: Team UUID
@@ -1612,12 +1840,16 @@ class AlphaBoardClient:
         Returns:
             List of team members with profile info
         """
+        return await self._cached_roster(f"team:{team_id}", lambda: self._fetch_team_members(team_id))
+    
+    async def _fetch_team_members(self, team_id: str) -> List[Dict[str, Any]]:
+        """Query the members of a team (see get_team_members)."""
         try:
             # Get team memberships
-            tm_result = self.supabase.table("team_members") \
+            tm_query = self.supabase.table("team_members") \
                 .select("user_id") \
-                .eq("team_id", team_id) \
-                .execute()
+                .eq("team_id", team_id)
+            tm_result = await self._execute(tm_query)
             
             if not tm_result.data:
                 return []
@@ -1625,10 +1857,10 @@ class AlphaBoardClient:
             user_ids = [m["user_id"] for m in tm_result.data]
             
             # Get profiles for these users
-            profiles_result = self.supabase.table("profiles") \
+            profiles_query = self.supabase.table("profiles") \
                 .select("id, username, full_name, role") \
-                .in_("id", user_ids) \
-                .execute()
+                .in_("id", user_ids)
+            profiles_result = await self._execute(profiles_query)
             
             members = []
             if profiles_result.data:
@@ -1648,7 +1880,7 @@ class AlphaBoardClient:
     
     async def get_organization_members(self, organization_id: str) -> List[Dict[str, Any]]:
         """
-        Get all members of an organization.
+        Get all members of an organization (cached for ROSTER_CACHE_TTL_SECONDS).
         
         Args:
             organization_id: Organization UUID
@@ -1656,12 +1888,19 @@ class AlphaBoardClient:
         Returns:
             List of organization members
         """
+        return await self._cached_roster(
+            f"org:{organization_id}",
+            lambda: self._fetch_organization_members(organization_id)
+        )
+    
+    async def _fetch_organization_members(self, organization_id: str) -> List[Dict[str, Any]]:
+        """Query the members of an organization (see get_organization_members)."""
         try:
             # Get members from user_organization_membership (source of truth)
-            membership_result = self.supabase.table("user_organization_membership") \
+            membership_query = self.supabase.table("user_organization_membership") \
                 .select("user_id, role") \
-                .eq("organization_id", organization_id) \
-                .execute()
+                .eq("organization_id", organization_id)
+            membership_result = await self._execute(membership_query)
             
             if not membership_result.data:
                 return []
@@ -1670,11 +1909,11 @@ class AlphaBoardClient:
             user_ids = [m["user_id"] for m in membership_result.data]
             
             # Get profiles for these users
-            profiles_result = self.supabase.table("profiles") \
+            profiles_query = self.supabase.table("profiles") \
                 .select("id, username, full_name, role") \
                 .in_("id", user_ids) \
-                .order("username") \
-                .execute()
+                .order("username")
+            profiles_result = await self._execute(profiles_query)
             
             # Combine membership role with profile data
             members = []
@@ -1703,36 +1942,46 @@ class AlphaBoardClient:
     async def get_analyst_recommendations_detailed(
         self,
         analyst_user_id: str,
-        status: str = "OPEN"
-    ) -> List[Dict[str, Any]]:
+        status: str = "OPEN",
+        limit: int = 50,
+        offset: int = 0,
+        only_count: bool = False
+    ) -> Union[List[Dict[str, Any]], int]:
         """
         Get detailed recommendations for an analyst with all fields.
         
         Args:
             analyst_user_id: Analyst's Supabase UUID
             status: OPEN, CLOSED, or WATCHLIST
+            limit: Maximum number of recommendations to fetch
+            offset: Number of recommendations to skip (for pagination)
+            only_count: If True, return only the matching row count without fetching rows
             
         Returns:
-            List of recommendations with full details
+            List of recommendations with full details, or the row count if only_count is set
         """
+        if only_count:
+            return await self.count_analyst_recommendations(analyst_user_id, status)
+        
+        # Use the result of prefetch_analyst_bundle if one is in flight for this query
+        if offset == 0:
+            prefetched = self._prefetch.pop(("recommendations", analyst_user_id, status, limit), None)
+            if prefetched is not None:
+                return await prefetched
+        
+        return await self._fetch_analyst_recommendations_detailed(analyst_user_id, status, limit, offset)
+    
+    async def _fetch_analyst_recommendations_detailed(
+        self,
+        analyst_user_id: str,
+        status: str,
+        limit: int,
+        offset: int
+    ) -> List[Dict[str, Any]]:
+        """Query and format an analyst's recommendations (see get_analyst_recommendations_detailed)."""
         try:
             logger.info(f"🔍 [RECOMMENDATIONS] Starting fetch for analyst Supabase UUID: {analyst_user_id}")
-            logger.info(f"🔍 [RECOMMENDATIONS] Status filter: {status}")
-            
-            # First verify the analyst exists
-            logger.info(f"🔍 [RECOMMENDATIONS] Step 1: Verifying analyst exists in public.profiles")
-            profile_check = self.supabase.table("profiles") \
-                .select("id, username") \
-                .eq("id", analyst_user_id) \
-                .limit(1) \
-                .execute()
-            
-            if not profile_check.data or len(profile_check.data) == 0:
-                logger.error(f"❌ [RECOMMENDATIONS] Analyst {analyst_user_id} NOT FOUND in profiles table")
-                return []
-            
-            analyst_username = profile_check.data[0].get('username', 'Unknown')
-            logger.info(f"✅ [RECOMMENDATIONS] Analyst verified: {analyst_username} (UUID: {analyst_user_id})")
+            logger.info(f"🔍 [RECOMMENDATIONS] Status filter: {status}, limit: {limit}, offset: {offset}")
             
             # Build query with explicit error handling - DIRECT query to public.recommendations
             result = None
@@ -1755,7 +2004,7 @@ class AlphaBoardClient:
                     logger.info("🔍 [RECOMMENDATIONS] Headers ensured before query")
                 
                 # Direct query to public.recommendations table
-                logger.info(f"🔍 [RECOMMENDATIONS] Step 2: Building query for public.recommendations")
+                logger.info(f"🔍 [RECOMMENDATIONS] Step 1: Building query for public.recommendations")
                 logger.info(f"🔍 [RECOMMENDATIONS] Query params: user_id={analyst_user_id}, status={status}")
                 
                 # Build query step by step for better debugging
@@ -1772,13 +2021,24 @@ class AlphaBoardClient:
                     logger.info(f"🔍 [RECOMMENDATIONS] No status filter - fetching all recommendations")
                     ordered_query = user_query.order("entry_date", desc=True)
                 
-                # Limit results
-                final_query = ordered_query.limit(50)
+                # Limit results (range is inclusive on both ends)
+                final_query = ordered_query.range(offset, offset + limit - 1)
+                
+                # Execute query, verifying the analyst exists in public.profiles
+                # at the same time
+                logger.info(f"🔍 [RECOMMENDATIONS] Step 2: Executing query")
+                logger.info(f"🔍 [RECOMMENDATIONS] SQL equivalent: SELECT * FROM recommendations WHERE user_id='{analyst_user_id}' AND status='{status if status else 'ALL'}' ORDER BY entry_date DESC LIMIT {limit} OFFSET {offset}")
+                profile_check, result = await asyncio.gather(
+                    self.get_profile(analyst_user_id, "id, username"),
+                    self._execute(final_query)
+                )
                 
-                # Execute query
-                logger.info(f"🔍 [RECOMMENDATIONS] Step 3: Executing query")
-                logger.info(f"🔍 [RECOMMENDATIONS] SQL equivalent: SELECT * FROM recommendations WHERE user_id='{analyst_user_id}' AND status='{status if status else 'ALL'}' ORDER BY entry_date DESC LIMIT 50")
-                result = final_query.execute()
+                if not profile_check:
+                    logger.error(f"❌ [RECOMMENDATIONS] Analyst {analyst_user_id} NOT FOUND in profiles table")
+                    return []
+                
+                analyst_username = profile_check.get('username', 'Unknown')
+                logger.info(f"✅ [RECOMMENDATIONS] Analyst verified: {analyst_username} (UUID: {analyst_user_id})")
                 
                 # Log result
                 if result.data:
@@ -1799,7 +2059,7 @@ class AlphaBoardClient:
                         logger.error("API key error detected - ensuring headers are set")
                         self._ensure_headers_set(service_key)
                         # Retry query with same final_query
-                        result = final_query.execute()
+                        result = await self._execute(final_query)
                     else:
                         return []
                 
@@ -1829,7 +2089,7 @@ class AlphaBoardClient:
                             .order("entry_date", desc=True)
                         if status:
                             query = query.eq("status", status)
-                        result = query.limit(50).execute()
+                        result = await self._execute(query.range(offset, offset + limit - 1))
                         logger.info(f"Retry query returned {len(result.data) if result.data else 0} recommendations")
                     except Exception as retry_error:
                         logger.error(f"Retry also failed: {retry_error}", exc_info=True)
@@ -1844,11 +2104,11 @@ class AlphaBoardClient:
             if (not result or not result.data or len(result.data) == 0) and status:
                 logger.info(f"No {status} recommendations found, checking if analyst has any recommendations...")
                 try:
-                    all_recs_check = self.supabase.table("recommendations") \
+                    check_query = self.supabase.table("recommendations") \
                         .select("status, ticker") \
                         .eq("user_id", analyst_user_id) \
-                        .limit(10) \
-                        .execute()
+                        .limit(10)
+                    all_recs_check = await self._execute(check_query)
                     
                     if all_recs_check.data:
                         statuses = [r.get("status") for r in all_recs_check.data]
@@ -1895,6 +2155,61 @@ class AlphaBoardClient:
             logger.error(f"❌ [RECOMMENDATIONS] Error fetching analyst recommendations for UUID {analyst_user_id}: {e}", exc_info=True)
             return []
     
+    async def count_analyst_recommendations(
+        self,
+        analyst_user_id: str,
+        status: Optional[str] = "OPEN"
+    ) -> int:
+        """
+        Count recommendations for an analyst without fetching any rows.
+        
+        Args:
+            analyst_user_id: Analyst's Supabase UUID
+            status: OPEN, CLOSED, WATCHLIST, or None for all statuses
+            
+        Returns:
+            Number of matching recommendations (0 on error)
+        """
+        try:
+            query = self.supabase.table("recommendations") \
+                .select("id", count="exact") \
+                .eq("user_id", analyst_user_id)
+            if status:
+                query = query.eq("status", status)
+            
+            result = await self._execute(query.limit(0))
+            return result.count or 0
+            
+        except Exception as e:
+            logger.error(f"Error counting analyst recommendations: {e}")
+            return 0
+    
+    async def prefetch_analyst_bundle(
+        self,
+        analyst_user_id: str,
+        status: Optional[str] = "OPEN",
+        limit: int = 50
+    ) -> None:
+        """
+        Start fetching an analyst's performance and recommendations in the background.
+        
+        The next get_analyst_performance / get_analyst_recommendations_detailed
+        call for the same analyst awaits the in-flight task instead of issuing
+        a new query. The performance query runs in a worker thread so it
+        overlaps with the recommendations query.
+        
+        Args:
+            analyst_user_id: Analyst's Supabase UUID
+            status: Recommendation status to prefetch, or None for all statuses
+            limit: Number of recommendations to prefetch
+        """
+        self._prefetch[("performance", analyst_user_id)] = asyncio.create_task(
+            asyncio.to_thread(self._fetch_analyst_performance, analyst_user_id)
+        )
+        self._prefetch[("recommendations", analyst_user_id, status, limit)] = asyncio.create_task(
+            self._fetch_analyst_recommendations_detailed(analyst_user_id, status, limit, 0)
+        )
+    
     async def get_analyst_performance(self, analyst_user_id: str) -> Dict[str, Any]:
         """
         Get performance stats for an analyst.
@@ -1905,6 +2220,14 @@ class AlphaBoardClient:
         Returns:
             Performance stats
         """
+        prefetched = self._prefetch.pop(("performance", analyst_user_id), None)
+        if prefetched is not None:
+            return await prefetched
+        
+        return await asyncio.to_thread(self._fetch_analyst_performance, analyst_user_id)
+    
+    def _fetch_analyst_performance(self, analyst_user_id: str) -> Dict[str, Any]:
+        """Query performance stats for an analyst (see get_analyst_performance)."""
         try:
             result = self.supabase.table("performance") \
                 .select("*") \
@@ -1933,7 +2256,7 @@ class AlphaBoardClient:
         """
         try:
             url = f"{self.api_base_url}/"
-            response = await self._http_client.get(url)
+            response = await self._http_client.get(url, headers=self._headers, timeout=30.0)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"AlphaBoard health check failed: {e}")
@@ -4,9 +4,12 @@ Uses pydantic BaseSettings for environment variable loading and validation.
 """
 
 import os
-from functools import lru_cache
-from typing import Literal, Set
-from pydantic_settings import BaseSettings
+import sys
+from functools import cached_property, lru_cache
+from typing import Dict, FrozenSet, Literal
+from urllib.parse import urlparse
+from pydantic import AliasChoices, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 # =============================================================================
@@ -14,7 +17,7 @@ from pydantic_settings import BaseSettings
 # Only news from these domains will be shown with links
 # =============================================================================
 
-CREDIBLE_NEWS_SOURCES: Set[str] = {
+CREDIBLE_NEWS_SOURCES: FrozenSet[str] = frozenset(sys.intern(domain) for domain in {
     # Indian Markets
     "economictimes.indiatimes.com",
     "moneycontrol.com",
@@ -52,10 +55,10 @@ CREDIBLE_NEWS_SOURCES: Set[str] = {
     # News Agencies
     "apnews.com",
     "news.google.com",  # Only if redirects to credible source
-}
+})
 
 # Mapping of domain to display name
-NEWS_SOURCE_NAMES = {
+NEWS_SOURCE_NAMES: Dict[str, str] = {sys.intern(domain): name for domain, name in {
     "economictimes.indiatimes.com": "Economic Times",
     "moneycontrol.com": "Moneycontrol",
     "livemint.com": "Mint",
@@ -78,7 +81,26 @@ NEWS_SOURCE_NAMES = {
     "ft.com": "Financial Times",
     "benzinga.com": "Benzinga",
     "morningstar.com": "Morningstar",
-}
+}.items()}
+
+
+@lru_cache(maxsize=4096)
+def _match_credible_domain(domain: str) -> tuple[bool, str]:
+    """
+    Match a domain, or the nearest parent domain, against the whitelist.
+    
+    Each suffix at a label boundary is one set lookup, so "in.reuters.com"
+    matches "reuters.com" but "microsoft.com" does not match "ft.com".
+    
+    Returns:
+        Tuple of (is_credible, source_name)
+    """
+    labels = domain.split(".")
+    for start in range(len(labels) - 1):
+        candidate = ".".join(labels[start:])
+        if candidate in CREDIBLE_NEWS_SOURCES:
+            return True, NEWS_SOURCE_NAMES.get(candidate, candidate.split('.')[0].title())
+    return False, ""
 
 
 def get_source_from_url(url: str) -> tuple[bool, str, str]:
@@ -95,21 +117,14 @@ def get_source_from_url(url: str) -> tuple[bool, str, str]:
         return False, "", ""
     
     try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
+        domain = urlparse(url).hostname or ""
         
         # Remove www. prefix
         if domain.startswith("www."):
             domain = domain[4:]
         
-        # Check if domain matches any credible source
-        for credible_domain in CREDIBLE_NEWS_SOURCES:
-            if credible_domain in domain or domain.endswith(credible_domain):
-                source_name = NEWS_SOURCE_NAMES.get(credible_domain, credible_domain.split('.')[0].title())
-                return True, source_name, domain
-        
-        return False, "", domain
+        is_credible, source_name = _match_credible_domain(domain)
+        return is_credible, source_name, domain
     except Exception:
         return False, "", ""
 
@@ -159,6 +174,13 @@ class Settings(BaseSettings):
     # =========================================================================
     ADMIN_API_KEY: str = ""
     
+    # =========================================================================
+    # Conversation State Configuration (Optional)
+    # =========================================================================
+    # Set to share conversation state and per-user lookup caches across
+    # workers/replicas
+    REDIS_URL: str = ""
+    
     # =========================================================================
     # Application Configuration
     # =========================================================================
@@ -171,13 +193,20 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     # PORT defaults to 8001, but BaseSettings will automatically read from PORT env var if set
     PORT: int = 8001
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
-    
-    @property
+    # Worker processes for `python -m src.main` outside development (also read
+    # from WEB_CONCURRENCY). More than one needs REDIS_URL for shared state.
+    WORKERS: int = Field(default=1, ge=1, validation_alias=AliasChoices("WORKERS", "WEB_CONCURRENCY"))
+    # Comma-separated browser origins allowed to call the /api routes
+    CORS_ALLOWED_ORIGINS: str = "*"
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        frozen=True,
+    )
+    
+    @cached_property
     def whatsapp_api_url(self) -> str:
         """Get the full WhatsApp API URL for sending messages."""
         return f"https://graph.facebook.com/{self.META_WHATSAPP_API_VERSION}/{self.META_WHATSAPP_PHONE_NUMBER_ID}/messages"
@@ -3,22 +3,33 @@ Conversation State Management.
 Tracks multi-step conversations for interactive flows.
 """
 
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Protocol
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import IntEnum
+
+from .config import Settings, get_settings
+from .redis_client import get_redis_client
 
 logger = logging.getLogger(__name__)
 
+# Idle contexts older than this are dropped from the store entirely
+STATE_RETENTION_MINUTES = 30
+
+# Upper bound on tracked users; the oldest context is evicted beyond this
+MAX_CONVERSATION_STATES = 10_000
+
 
-class ConversationFlow(Enum):
-    """Enum for conversation flow types."""
-    NONE = "none"
-    ADD_RECOMMENDATION = "add_recommendation"
-    ADD_WATCHLIST = "add_watchlist"
-    SET_ALERT = "set_alert"
-    TRACK_ANALYST = "track_analyst"
+class ConversationFlow(IntEnum):
+    """Enum for conversation flow types. NONE is 0, so it is falsy."""
+    NONE = 0
+    ADD_RECOMMENDATION = 1
+    ADD_WATCHLIST = 2
+    SET_ALERT = 3
+    TRACK_ANALYST = 4
 
 
 @dataclass
@@ -27,94 +38,202 @@ class ConversationContext:
     flow: ConversationFlow = ConversationFlow.NONE
     step: int = 0
     data: Dict[str, Any] = field(default_factory=dict)
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: float = field(default_factory=time.monotonic)
     
     def is_expired(self, timeout_minutes: int = 10) -> bool:
         """Check if conversation has expired."""
-        return datetime.utcnow() - self.created_at > timedelta(minutes=timeout_minutes)
+        return (time.monotonic() - self.created_at) > timeout_minutes * 60
     
     def reset(self):
         """Reset conversation state."""
         self.flow = ConversationFlow.NONE
         self.step = 0
         self.data = {}
-        self.created_at = datetime.utcnow()
+        self.created_at = time.monotonic()
+
+
+class ConversationStore(Protocol):
+    """Backing store for conversation contexts, keyed by WhatsApp user ID."""
+    
+    async def get(self, user_id: str) -> Optional[ConversationContext]:
+        ...
+    
+    async def set(self, user_id: str, context: ConversationContext) -> None:
+        ...
+    
+    async def delete(self, user_id: str) -> None:
+        ...
+    
+    async def sweep(self) -> None:
+        ...
+
+
+class InMemoryConversationStore:
+    """
+    Process-local store (suitable for single-instance deployment).
+    
+    Contexts are kept in write order (oldest first), so stale entries can be
+    evicted from the front without scanning the whole map. The map is also
+    capped at MAX_CONVERSATION_STATES entries, so a burst of one-off senders
+    cannot grow it without bound.
+    """
+    
+    def __init__(self, max_size: int = MAX_CONVERSATION_STATES):
+        self._states: "OrderedDict[str, ConversationContext]" = OrderedDict()
+        self._max_size = max_size
+    
+    async def get(self, user_id: str) -> Optional[ConversationContext]:
+        # Amortised cleanup: drop at most one stale state per lookup
+        if self._states:
+            oldest_user_id, oldest = next(iter(self._states.items()))
+            if oldest.is_expired(timeout_minutes=STATE_RETENTION_MINUTES):
+                del self._states[oldest_user_id]
+        return self._states.get(user_id)
+    
+    async def set(self, user_id: str, context: ConversationContext) -> None:
+        self._states[user_id] = context
+        self._states.move_to_end(user_id)
+        if len(self._states) > self._max_size:
+            self._states.popitem(last=False)
+    
+    async def delete(self, user_id: str) -> None:
+        self._states.pop(user_id, None)
+    
+    async def sweep(self) -> None:
+        while self._states:
+            oldest = next(iter(self._states.values()))
+            if not oldest.is_expired(timeout_minutes=STATE_RETENTION_MINUTES):
+                break
+            self._states.popitem(last=False)
+
+
+class RedisConversationStore:
+    """
+    Redis-backed store, so every worker and replica sees the same flows.
+    
+    Each context is a hash at conv:{user_id}, written together with an
+    EXPIRE so Redis drops idle conversations itself. Takes a `redis.asyncio`
+    client (see get_redis_client), so lookups never block the event loop.
+    """
+    
+    KEY_PREFIX = "conv:"
+    
+    def __init__(self, redis_client: Any, ttl_seconds: int = STATE_RETENTION_MINUTES * 60):
+        self._redis = redis_client
+        self._ttl_seconds = ttl_seconds
+    
+    async def get(self, user_id: str) -> Optional[ConversationContext]:
+        fields = await self._redis.hgetall(self.KEY_PREFIX + user_id)
+        if not fields:
+            return None
+        
+        # created_at is process-local (monotonic); Redis holds wall-clock time
+        age_seconds = time.time() - float(fields["started_at"])
+        return ConversationContext(
+            flow=ConversationFlow(int(fields["flow"])),
+            step=int(fields["step"]),
+            data=json.loads(fields["data"]),
+            created_at=time.monotonic() - age_seconds
+        )
+    
+    async def set(self, user_id: str, context: ConversationContext) -> None:
+        key = self.KEY_PREFIX + user_id
+        started_at = time.time() - (time.monotonic() - context.created_at)
+        
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={
+            "flow": int(context.flow),
+            "step": context.step,
+            "data": json.dumps(context.data),
+            "started_at": started_at
+        })
+        pipe.expire(key, self._ttl_seconds)
+        await pipe.execute()
+    
+    async def delete(self, user_id: str) -> None:
+        await self._redis.delete(self.KEY_PREFIX + user_id)
+    
+    async def sweep(self) -> None:
+        # Redis expires keys on its own
+        pass
+
+
+def create_conversation_store(settings: Settings) -> ConversationStore:
+    """Use Redis when REDIS_URL is configured, otherwise keep state in memory."""
+    if settings.REDIS_URL:
+        logger.info("Using Redis conversation store")
+        return RedisConversationStore(get_redis_client(settings.REDIS_URL))
+    return InMemoryConversationStore()
 
 
 class ConversationStateManager:
     """
     Manages conversation state for users.
-    Uses in-memory storage (suitable for single-instance deployment).
+    
+    Contexts live in a ConversationStore; every change goes through this
+    manager and is written back to the store. Users with no active flow have
+    no stored context at all.
     """
     
-    def __init__(self):
-        self._states: Dict[str, ConversationContext] = {}
+    def __init__(self, store: Optional[ConversationStore] = None):
+        self._store = store if store is not None else InMemoryConversationStore()
     
-    def get_context(self, user_id: str) -> ConversationContext:
-        """Get or create conversation context for a user."""
-        if user_id not in self._states:
-            self._states[user_id] = ConversationContext()
-        
-        context = self._states[user_id]
+    async def get_context(self, user_id: str) -> ConversationContext:
+        """Get conversation context for a user (a fresh one if none is active)."""
+        context = await self._store.get(user_id)
+        if context is None:
+            return ConversationContext()
         
         # Reset if expired
         if context.is_expired():
-            context.reset()
+            await self._store.delete(user_id)
+            return ConversationContext()
         
         return context
     
-    def start_flow(
+    async def start_flow(
         self,
         user_id: str,
         flow: ConversationFlow,
         initial_data: Optional[Dict[str, Any]] = None
     ) -> ConversationContext:
         """Start a new conversation flow."""
-        context = self.get_context(user_id)
-        context.flow = flow
-        context.step = 1
-        context.data = initial_data or {}
-        context.created_at = datetime.utcnow()
-        logger.info(f"Started flow {flow.value} for user {user_id}")
+        context = ConversationContext(flow=flow, step=1, data=initial_data or {})
+        await self._store.set(user_id, context)
+        logger.info("Started flow %s for user %s", flow.name, user_id)
         return context
     
-    def advance_step(self, user_id: str, data_update: Optional[Dict[str, Any]] = None) -> ConversationContext:
+    async def advance_step(self, user_id: str, data_update: Optional[Dict[str, Any]] = None) -> ConversationContext:
         """Advance to next step in flow."""
-        context = self.get_context(user_id)
+        context = await self.get_context(user_id)
         context.step += 1
         if data_update:
             context.data.update(data_update)
+        await self._store.set(user_id, context)
         return context
     
-    def complete_flow(self, user_id: str) -> Dict[str, Any]:
+    async def complete_flow(self, user_id: str) -> Dict[str, Any]:
         """Complete flow and return collected data."""
-        context = self.get_context(user_id)
-        data = context.data.copy()
-        context.reset()
-        logger.info(f"Completed flow for user {user_id}")
+        # The context is discarded, so its data can be handed over as-is
+        data = (await self.get_context(user_id)).data
+        await self._store.delete(user_id)
+        logger.info("Completed flow for user %s", user_id)
         return data
     
-    def cancel_flow(self, user_id: str):
+    async def cancel_flow(self, user_id: str):
         """Cancel current flow."""
-        context = self.get_context(user_id)
-        context.reset()
-        logger.info(f"Cancelled flow for user {user_id}")
+        await self._store.delete(user_id)
+        logger.info("Cancelled flow for user %s", user_id)
     
-    def is_in_flow(self, user_id: str) -> bool:
+    async def is_in_flow(self, user_id: str) -> bool:
         """Check if user is in an active flow."""
-        context = self.get_context(user_id)
-        return context.flow != ConversationFlow.NONE and not context.is_expired()
+        context = await self.get_context(user_id)
+        return bool(context.flow) and not context.is_expired()
     
-    def cleanup_expired(self):
+    async def cleanup_expired(self):
         """Remove expired conversation states."""
-        expired_users = [
-            user_id for user_id, context in self._states.items()
-            if context.is_expired(timeout_minutes=30)
-        ]
-        for user_id in expired_users:
-            del self._states[user_id]
+        await self._store.sweep()
 
 
 # Global state manager instance
-state_manager = ConversationStateManager()
-
+state_manager = ConversationStateManager(create_conversation_store(get_settings()))
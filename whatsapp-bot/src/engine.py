@@ -4,8 +4,10 @@ Central message routing and command parser for WhatsApp bot.
 """
 
 import re
+import asyncio
 import logging
-from typing import Optional, Dict, Any, Tuple
+from functools import lru_cache, wraps
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 
 from .config import Settings
 from .schemas import ParsedMessage
@@ -18,6 +20,135 @@ from .conversation_state import state_manager, ConversationFlow
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def format_inr(amount: float) -> str:
+    """
+    Format a rupee amount with thousands separators and no decimals.
+    
+    Memoized because list renders repeat the same entry, current and
+    trigger prices across rows and across users.
+    """
+    return f"₹{amount:,.0f}"
+
+
+def requires_link_state(
+    error_reply: Optional[str] = None
+) -> Callable[[Callable[..., Awaitable[None]]], Callable[..., Awaitable[None]]]:
+    """
+    Decorate an account handler that only applies to unlinked users.
+    
+    Looks up the link status once; linked users get the "already linked"
+    reply and the handler is skipped. If the lookup fails, error_reply is
+    sent (the generic error message when None).
+    
+    Args:
+        error_reply: Message to send when the status lookup fails
+    """
+    def decorator(handler: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+        @wraps(handler)
+        async def wrapper(self: "MessageEngine", phone: str, user_id: str) -> None:
+            try:
+                status = await self.ab_client.get_user_account_status(user_id)
+            except AlphaBoardClientError as e:
+                logger.error("Error getting account status in %s: %s", handler.__name__, e)
+                await self.wa_client.send_text_message(phone, error_reply or Templates.ERROR_MESSAGE)
+                return
+            
+            if status.get("is_linked"):
+                username = status.get("username") or status.get("full_name") or "your account"
+                await self.wa_client.send_text_message(
+                    phone,
+                    Templates.ACCOUNT_ALREADY_LINKED.format(username=username)
+                )
+                return
+            
+            await handler(self, phone, user_id)
+        
+        return wrapper
+    
+    return decorator
+
+
+# Words that cancel an in-progress flow (checked before any other routing)
+CANCEL_KEYWORDS = frozenset({"cancel", "exit", "quit", "stop"})
+
+# Replies that skip the optional thesis step
+SKIP_KEYWORDS = frozenset({"skip", "none", "-"})
+
+# Exact-match text commands (lowercased), mapped to the MessageEngine handler
+# they route to. Every handler is called as handler(engine, phone, user_id).
+KEYWORD_ROUTES: Dict[str, str] = {
+    **dict.fromkeys(("help", "menu", "hi", "hello", "start", "hey", "?"), "_send_main_menu"),
+    **dict.fromkeys(("add", "new", "rec", "recommend", "add rec", "new rec"), "_start_recommendation_flow"),
+    **dict.fromkeys(("alert", "set alert", "alerts", "price alert"), "_start_alert_flow"),
+    **dict.fromkeys(("signup", "sign up", "register", "create account"), "_handle_signup"),
+    **dict.fromkeys(
+        ("connect", "link", "link account", "connect account", "signin", "sign in", "login"),
+        "_handle_connect_account"
+    ),
+    **dict.fromkeys(("account", "my account", "account status", "status"), "_handle_account_status"),
+    **dict.fromkeys(("unlink", "unlink account", "disconnect", "disconnect account"), "_handle_unlink_account"),
+    **dict.fromkeys(("my watchlist", "watchlist", "show watchlist", "list watchlist"), "_handle_show_watchlist"),
+    **dict.fromkeys(
+        ("my recs", "my recommendations", "recommendations", "show recs", "recs"),
+        "_handle_show_recommendations"
+    ),
+    **dict.fromkeys(("history", "closed", "closed recs", "pnl", "full pnl"), "_handle_show_history"),
+    **dict.fromkeys(
+        ("track", "track position", "track positions", "analyst", "team performance"),
+        "_handle_admin_track_start"
+    ),
+    **dict.fromkeys(
+        ("market close", "market", "today summary", "daily report", "summary"),
+        "_handle_market_close"
+    ),
+}
+
+
+# Leading words of the free-form commands in MessageEngine.COMMAND_PATTERN
+# ("rec" also covers "recommend"). Text that starts with none of these can
+# only match as a bare ticker, which is at most MAX_TICKER_LENGTH chars.
+COMMAND_PREFIXES = ("add", "watch", "rec", "podcast", "news")
+MAX_TICKER_LENGTH = 13
+
+# News sentiment markers; anything else (neutral, missing) gets "⚪"
+SENTIMENT_EMOJI = {"positive": "🟢", "negative": "🔴"}
+
+# Positions listed in the track-analyst view. One extra row is fetched so
+# the "and N more" footer only needs a count query when there are more.
+ANALYST_RECS_SHOWN = 15
+
+# Fixed interactive reply IDs, mapped to the MessageEngine handler they route
+# to. Every handler is called as handler(engine, phone, user_id).
+INTERACTIVE_ROUTES: Dict[str, str] = {
+    "thesis_skip": "_handle_thesis_skip",
+    "menu_add_watchlist": "_start_watchlist_flow",
+    "menu_add_recommendation": "_start_recommendation_flow",
+    "menu_set_alert": "_start_alert_flow",
+    "menu_show_watchlist": "_handle_show_watchlist",
+    "menu_my_recs": "_handle_show_recommendations",
+    "menu_market_close": "_handle_market_close",
+    "menu_news": "_send_news_prompt",
+    "menu_podcast": "_send_podcast_prompt",
+    "menu_help": "_send_help_text",
+    "menu_connect_account": "_handle_connect_account",
+    "menu_account_status": "_handle_account_status",
+    "menu_signup": "_handle_signup",
+    "menu_track_analyst": "_handle_admin_track_start",
+    "track_all_org": "_handle_track_all_organization",
+}
+
+# Prefixed interactive reply IDs, tried in order (analyst_status_ must come
+# before analyst_). Handlers are called as handler(engine, phone, user_id, rest)
+# where rest is the reply ID with the prefix stripped.
+INTERACTIVE_PREFIX_ROUTES: Tuple[Tuple[str, str], ...] = (
+    ("action_", "_handle_action_reply"),
+    ("team_", "_handle_team_selected"),
+    ("analyst_status_", "_handle_analyst_status_reply"),
+    ("analyst_", "_handle_analyst_selected"),
+)
+
+
 class MessageEngine:
     """
     Central message routing engine.
@@ -25,26 +156,35 @@ class MessageEngine:
     """
     
     # Regex patterns for command parsing
-    TICKER_PATTERN = re.compile(r'^[A-Z]{2,10}(?:\.[A-Z]{2})?$', re.IGNORECASE)
-    
-    # Command patterns
-    ADD_WATCHLIST_PATTERNS = [
-        re.compile(r'^add\s+([A-Z0-9.]+)(?:\s*[-:]\s*(.+))?$', re.IGNORECASE),
-        re.compile(r'^watch\s+([A-Z0-9.]+)(?:\s*[-:]\s*(.+))?$', re.IGNORECASE),
-    ]
+    TICKER_PATTERN = re.compile(r'^[A-Z]{2,10}(?:\.[A-Z]{2})?$', re.IGNORECASE | re.ASCII)
     
-    REC_PATTERN = re.compile(
-        r'^rec(?:ommend)?\s+([A-Z0-9.]+)(?:\s*[@at]+\s*(\d+(?:\.\d+)?))?\s*(.*)$',
-        re.IGNORECASE
+    # Free-form commands, tried in priority order by a single regex.
+    # The outer group that matched (match.lastgroup) names the command.
+    # Commands are ASCII, so re.ASCII keeps case folding and \s/\d on the
+    # ASCII tables.
+    COMMAND_PATTERN = re.compile(
+        r'^(?:'
+        r'(?P<add>(?:add|watch)\s+(?P<add_ticker>[A-Z0-9.]+)(?:\s*[-:]\s*(?P<add_note>.+))?)'
+        r'|(?P<rec>rec(?:ommend)?\s+(?P<rec_ticker>[A-Z0-9.]+)'
+        r'(?:\s*[@at]+\s*(?P<rec_price>\d+(?:\.\d+)?))?\s*(?P<rec_thesis>.*))'
+        r'|(?P<podcast>podcast\s+(?:on\s+|about\s+)?(?P<podcast_topic>.+))'
+        r'|(?P<news>news\s+(?:on\s+|for\s+)?(?P<news_ticker>[A-Z0-9.]+))'
+        r'|(?P<ticker>[A-Z]{2,10}(?:\.[A-Z]{2})?)'
+        r')$',
+        re.IGNORECASE | re.ASCII
     )
     
-    PODCAST_PATTERN = re.compile(
-        r'^podcast\s+(?:on\s+|about\s+)?(.+)$',
+    # Flow input patterns
+    TICKER_PRICE_PATTERN = re.compile(
+        r'^([A-Z0-9.]+)(?:\s*[@at]+\s*(\d+(?:\.\d+)?))?',
         re.IGNORECASE
     )
     
-    NEWS_PATTERN = re.compile(
-        r'^news\s+(?:on\s+|for\s+)?([A-Z0-9.]+)$',
+    # The optional direction owns its trailing whitespace, so a run of
+    # spaces can only be consumed one way and a non-matching input with a
+    # long run of spaces fails in linear rather than quadratic time.
+    ALERT_PATTERN = re.compile(
+        r'^([A-Z0-9.]+)\s*(?:(below|above|@|at)\s*)?(\d+(?:\.\d+)?)$',
         re.IGNORECASE
     )
     
@@ -58,12 +198,21 @@ class MessageEngine:
         self.settings = settings
         self.wa_client = WhatsAppClient(settings)
         self.ab_client = AlphaBoardClient(settings)
-        self.market_service = MarketReportService(settings)
+        self._market_service: Optional[MarketReportService] = None
+    
+    @property
+    def market_service(self) -> MarketReportService:
+        """Market report service, created on first use (most messages never need it)."""
+        if self._market_service is None:
+            self._market_service = MarketReportService(self.settings)
+        return self._market_service
     
     async def close(self):
         """Close all clients."""
         await self.wa_client.close()
         await self.ab_client.close()
+        if self._market_service is not None:
+            await self._market_service.close()
     
     async def handle_incoming_message(self, message: ParsedMessage) -> None:
         """
@@ -75,18 +224,17 @@ class MessageEngine:
         sender_phone = message.sender_phone
         
         try:
-            # Mark message as read
-            await self.wa_client.mark_message_read(message.raw_message_id)
-            
-            # Ensure user exists
-            user = await self.ab_client.get_or_create_user_by_phone(sender_phone)
-            user_id = user["id"]
+            # Mark message as read while ensuring the user exists
+            _, user_id = await asyncio.gather(
+                self._mark_message_read(message.raw_message_id),
+                self.ab_client.get_user_id_by_phone(sender_phone),
+            )
             
             # Route based on message type
             if message.message_type == "text":
                 await self._handle_text_message(sender_phone, user_id, message.text_body or "")
             
-            elif message.message_type in ("interactive_button", "interactive_list"):
+            elif message.message_type in {"interactive_button", "interactive_list"}:
                 await self._handle_interactive_reply(
                     sender_phone,
                     user_id,
@@ -99,12 +247,19 @@ class MessageEngine:
                 await self._send_help_message(sender_phone)
                 
         except AlphaBoardClientError as e:
-            logger.error(f"AlphaBoard error: {e}")
+            logger.error("AlphaBoard error: %s", e)
             await self._send_error_message(sender_phone)
         except Exception as e:
-            logger.error(f"Error handling message: {e}")
+            logger.error("Error handling message: %s", e)
             await self._send_error_message(sender_phone)
     
+    async def _mark_message_read(self, message_id: str) -> None:
+        """Mark a message as read; failures are logged and never block the reply."""
+        try:
+            await self.wa_client.mark_message_read(message_id)
+        except Exception as e:
+            logger.warning("Failed to mark message %s as read: %s", message_id, e)
+    
     async def _handle_text_message(self, phone: str, user_id: str, text: str) -> None:
         """
         Handle a text message and route to appropriate handler.
@@ -114,116 +269,68 @@ class MessageEngine:
             user_id: WhatsApp user ID
             text: Message text
         """
+        # Normalise once; the regex groups below never carry surrounding
+        # whitespace, so matched values need no further strip(). casefold()
+        # is the caseless-matching form of lower() (same result for ASCII).
         text = text.strip()
-        text_lower = text.lower()
+        text_lower = text.casefold()
         
         # Check for cancel command first
-        if text_lower in ("cancel", "exit", "quit", "stop"):
-            if state_manager.is_in_flow(user_id):
-                state_manager.cancel_flow(user_id)
+        if text_lower in CANCEL_KEYWORDS:
+            if await state_manager.is_in_flow(user_id):
+                await state_manager.cancel_flow(user_id)
                 await self.wa_client.send_text_message(phone, "❌ Cancelled. Type *menu* to start over.")
             else:
                 await self.wa_client.send_main_menu(phone)
             return
         
         # Check if user is in a conversation flow
-        if state_manager.is_in_flow(user_id):
+        if await state_manager.is_in_flow(user_id):
             await self._handle_conversation_flow(phone, user_id, text)
             return
         
-        # Check for menu/help commands
-        if text_lower in ("help", "menu", "hi", "hello", "start", "hey", "?"):
-            await self.wa_client.send_main_menu(phone)
-            return
-        
-        # Check for quick add rec command
-        if text_lower in ("add", "new", "rec", "recommend", "add rec", "new rec"):
-            await self._start_recommendation_flow(phone, user_id)
-            return
-        
-        # Check for alert command
-        if text_lower in ("alert", "set alert", "alerts", "price alert"):
-            await self._start_alert_flow(phone, user_id)
-            return
-        
-        # Check for signup/connect commands
-        if text_lower in ("signup", "sign up", "register", "create account"):
-            await self._handle_signup(phone, user_id)
-            return
-        
-        if text_lower in ("connect", "link", "link account", "connect account", "signin", "sign in", "login"):
-            await self._handle_connect_account(phone, user_id)
-            return
-        
-        if text_lower in ("account", "my account", "account status", "status"):
-            await self._handle_account_status(phone, user_id)
-            return
-        
-        if text_lower in ("unlink", "unlink account", "disconnect", "disconnect account"):
-            await self._handle_unlink_account(phone, user_id)
-            return
-        
-        # Check for watchlist view
-        if text_lower in ("my watchlist", "watchlist", "show watchlist", "list watchlist"):
-            await self._handle_show_watchlist(phone, user_id)
-            return
-        
-        # Check for recommendations view
-        if text_lower in ("my recs", "my recommendations", "recommendations", "show recs", "recs"):
-            await self._handle_show_recommendations(phone, user_id, show_closed=False)
-            return
-        
-        # Check for history/closed positions view
-        if text_lower in ("history", "closed", "closed recs", "pnl", "full pnl"):
-            await self._handle_show_recommendations(phone, user_id, show_closed=True)
+        # Check for exact keyword commands (menu, account, watchlist, recs, ...)
+        handler = _KEYWORD_HANDLERS.get(text_lower)
+        if handler:
+            await handler(self, phone, user_id)
             return
         
-        # Check for admin track command
-        if text_lower in ("track", "track position", "track positions", "analyst", "team performance"):
-            await self._handle_admin_track_start(phone, user_id)
-            return
+        # Check for free-form commands (add, rec, podcast, news, bare ticker),
+        # skipping the regex for sentences that cannot match any of them
+        if len(text) <= MAX_TICKER_LENGTH or text_lower.startswith(COMMAND_PREFIXES):
+            match = self.COMMAND_PATTERN.match(text)
+        else:
+            match = None
+        command = match.lastgroup if match else None
         
-        # Check for market close
-        if text_lower in ("market close", "market", "today summary", "daily report", "summary"):
-            await self._handle_market_close(phone, user_id)
+        if command == "add":
+            ticker, note = match.group("add_ticker", "add_note")
+            ticker = ticker.upper()
+            await self._handle_add_watchlist(phone, user_id, ticker, note)
             return
         
-        # Check for add to watchlist pattern
-        for pattern in self.ADD_WATCHLIST_PATTERNS:
-            match = pattern.match(text)
-            if match:
-                ticker = match.group(1).upper()
-                note = match.group(2).strip() if match.group(2) else None
-                await self._handle_add_watchlist(phone, user_id, ticker, note)
-                return
-        
-        # Check for quick recommendation pattern (rec TCS @ 320 thesis)
-        match = self.REC_PATTERN.match(text)
-        if match:
-            ticker = match.group(1).upper()
-            price_str = match.group(2)
+        if command == "rec":
+            # Quick recommendation (rec TCS @ 320 thesis)
+            ticker, price_str, thesis = match.group("rec_ticker", "rec_price", "rec_thesis")
+            ticker = ticker.upper()
             price = float(price_str) if price_str else None
-            thesis = match.group(3).strip() if match.group(3) else None
+            thesis = thesis or None
             await self._handle_add_recommendation_complete(phone, user_id, ticker, "BUY", price, thesis)
             return
         
-        # Check for podcast request
-        match = self.PODCAST_PATTERN.match(text)
-        if match:
-            topic = match.group(1).strip()
+        if command == "podcast":
+            topic = match.group("podcast_topic")
             await self._handle_podcast_request(phone, user_id, topic)
             return
         
-        # Check for news request
-        match = self.NEWS_PATTERN.match(text)
-        if match:
-            ticker = match.group(1).upper()
+        if command == "news":
+            ticker = match.group("news_ticker").upper()
             await self._handle_news_request(phone, user_id, ticker)
             return
         
-        # Check if it looks like a standalone ticker
-        if self.TICKER_PATTERN.match(text):
-            ticker = text.upper()
+        if command == "ticker":
+            # Looks like a standalone ticker
+            ticker = match.group("ticker").upper()
             await self._handle_ticker_query(phone, ticker)
             return
         
@@ -246,101 +353,36 @@ class MessageEngine:
             reply_id: Interactive reply ID
             reply_title: Interactive reply title
         """
-        # Handle action selection for recommendation flow
-        if reply_id.startswith("action_"):
-            action = reply_id.replace("action_", "").upper()
-            await self._handle_action_selected(phone, user_id, action)
+        # Fixed reply IDs (main menu, thesis skip, ...)
+        handler = _INTERACTIVE_HANDLERS.get(reply_id)
+        if handler:
+            await handler(self, phone, user_id)
             return
         
-        # Handle thesis skip
-        if reply_id == "thesis_skip":
-            await self._handle_thesis_skip(phone, user_id)
-            return
-        
-        # Map interactive IDs to actions
-        if reply_id == "menu_add_watchlist":
-            # Start watchlist flow
-            state_manager.start_flow(user_id, ConversationFlow.ADD_WATCHLIST)
-            await self.wa_client.send_text_message(
-                phone,
-                "👀 *Add to Watchlist*\n\nSend the stock ticker:\n\nExamples:\n• TCS\n• RELIANCE\n• INFY.NS"
-            )
-        
-        elif reply_id == "menu_add_recommendation":
-            # Start recommendation flow with action selector
-            await self._start_recommendation_flow(phone, user_id)
-        
-        elif reply_id == "menu_set_alert":
-            await self._start_alert_flow(phone, user_id)
-        
-        elif reply_id == "menu_show_watchlist":
-            await self._handle_show_watchlist(phone, user_id)
-        
-        elif reply_id == "menu_my_recs":
-            await self._handle_show_recommendations(phone, user_id)
-        
-        elif reply_id == "menu_market_close":
-            await self._handle_market_close(phone, user_id)
-        
-        elif reply_id == "menu_news":
-            await self.wa_client.send_text_message(
-                phone,
-                Templates.NEWS_PROMPT
-            )
-        
-        elif reply_id == "menu_podcast":
-            await self.wa_client.send_text_message(
-                phone,
-                Templates.PODCAST_PROMPT
-            )
-        
-        elif reply_id == "menu_help":
-            await self.wa_client.send_text_message(
-                phone,
-                Templates.HELP_MESSAGE
-            )
-        
-        elif reply_id == "menu_connect_account":
-            await self._handle_connect_account(phone, user_id)
-        
-        elif reply_id == "menu_account_status":
-            await self._handle_account_status(phone, user_id)
-        
-        elif reply_id == "menu_signup":
-            await self._handle_signup(phone, user_id)
-        
-        elif reply_id == "menu_track_analyst":
-            await self._handle_admin_track_start(phone, user_id)
-        
-        elif reply_id.startswith("team_"):
-            # Team selected in track analyst flow
-            team_id = reply_id.replace("team_", "")
-            await self._handle_team_selected(phone, user_id, team_id)
-        
-        elif reply_id.startswith("analyst_"):
-            # Analyst selected in track analyst flow
-            analyst_id = reply_id.replace("analyst_", "")
-            await self._handle_analyst_selected(phone, user_id, analyst_id)
-        
-        elif reply_id == "track_all_org":
-            await self._handle_track_all_organization(phone, user_id)
-        
-        elif reply_id.startswith("analyst_status_"):
-            # View OPEN/CLOSED for analyst
-            # Format: analyst_status_{STATUS}_{analyst_id}
-            parts = reply_id.replace("analyst_status_", "").split("_", 1)
-            if len(parts) == 2:
-                status = parts[0].upper()  # OPEN, CLOSED, or ALL
-                analyst_id = parts[1]
-                logger.info(f"User selected to view {status} positions for analyst {analyst_id}")
-                await self._handle_show_analyst_recs(phone, user_id, analyst_id, status)
-            else:
-                logger.error(f"Invalid analyst_status format: {reply_id}")
-                await self._send_error_message(phone)
+        # Prefixed reply IDs carry a payload (action, team ID, analyst ID, ...)
+        for prefix, prefix_handler in _INTERACTIVE_PREFIX_HANDLERS:
+            if reply_id.startswith(prefix):
+                await prefix_handler(self, phone, user_id, reply_id[len(prefix):])
+                return
         
+        # Unknown interactive reply
+        await self._send_fallback_help(phone)
+    
+    async def _handle_action_reply(self, phone: str, user_id: str, action: str) -> None:
+        """Handle action button (action_buy, action_sell, ...) in recommendation flow."""
+        await self._handle_action_selected(phone, user_id, action.upper())
+    
+    async def _handle_analyst_status_reply(self, phone: str, user_id: str, payload: str) -> None:
+        """Handle OPEN/CLOSED view for an analyst. Payload format: {STATUS}_{analyst_id}."""
+        parts = payload.split("_", 1)
+        if len(parts) == 2:
+            status = parts[0].upper()  # OPEN, CLOSED, or ALL
+            analyst_id = parts[1]
+            logger.info("User selected to view %s positions for analyst %s", status, analyst_id)
+            await self._handle_show_analyst_recs(phone, user_id, analyst_id, status)
         else:
-            # Unknown interactive reply
-            await self._send_fallback_help(phone)
+            logger.error("Invalid analyst_status format: %s", payload)
+            await self._send_error_message(phone)
     
     # =========================================================================
     # Command Handlers
@@ -365,7 +407,7 @@ class MessageEngine:
             await self.wa_client.send_text_message(phone, response)
             
         except AlphaBoardClientError as e:
-            logger.error(f"Error adding to watchlist: {e}")
+            logger.error("Error adding to watchlist: %s", e)
             await self.wa_client.send_text_message(
                 phone,
                 f"❌ Couldn't add {ticker} to watchlist. Please try again."
@@ -374,67 +416,72 @@ class MessageEngine:
     async def _handle_show_watchlist(self, phone: str, user_id: str) -> None:
         """Handle show watchlist command. Shows both WhatsApp and AlphaBoard watchlist if linked."""
         try:
-            # Get WhatsApp watchlist
-            wa_watchlist = await self.ab_client.list_watchlist(user_id)
-            
-            # Check if account is linked to get AlphaBoard watchlist too
-            account_status = await self.ab_client.get_user_account_status(user_id)
+            # Get WhatsApp watchlist, and check if account is linked to get
+            # AlphaBoard watchlist too (independent lookups, run together)
+            wa_watchlist, account_status = await asyncio.gather(
+                self.ab_client.list_watchlist(user_id),
+                self.ab_client.get_user_account_status(user_id),
+            )
             ab_watchlist = []
-            price_alerts = {}
+            price_alerts: Dict[str, str] = {}
             
             if account_status.get("is_linked") and account_status.get("supabase_user_id"):
-                ab_watchlist = await self.ab_client.get_alphaboard_watchlist(account_status["supabase_user_id"])
-                # Get price alerts for the user
-                alerts_list = await self.ab_client.get_user_price_alerts(user_id)
+                # AlphaBoard watchlist and price alerts for the user
+                ab_watchlist, alerts_list = await asyncio.gather(
+                    self.ab_client.get_alphaboard_watchlist(account_status["supabase_user_id"]),
+                    self.ab_client.get_user_price_alerts(user_id),
+                )
+                # Render each alert line once here, keyed by ticker, so the
+                # row loop below only needs a single lookup per item
                 for alert in alerts_list:
                     ticker = alert.get("ticker", "")
-                    if ticker:
-                        price_alerts[ticker] = alert
+                    trigger_price = alert.get("trigger_price")
+                    if ticker and trigger_price:
+                        # BUY = alert when below, SELL = alert when above
+                        direction = "below" if alert.get("alert_type", "") == "BUY" else "above"
+                        price_alerts[ticker] = f"   🔔 {direction} {format_inr(float(trigger_price))}"
             
-            # Combine watchlists (dedupe by ticker)
+            # Combine watchlists (dedupe by ticker). AlphaBoard entries carry
+            # the richer price data, so index them first and build each merged
+            # entry in one go instead of inserting and then updating it.
+            ab_by_ticker = {item["ticker"]: item for item in ab_watchlist if item.get("ticker")}
             all_items = {}
             
-            # Add WhatsApp watchlist items
+            # WhatsApp watchlist items keep their position and note
             for item in wa_watchlist:
                 ticker = item["ticker"]
                 created_at = item.get("created_at", "")
                 date_str = created_at[:10] if created_at else ""
+                ab_item = ab_by_ticker.get(ticker)
+                if ab_item is None:
+                    entry_price = current_price = None
+                else:
+                    entry_date = ab_item.get("entry_date", "")
+                    date_str = entry_date[:10] if entry_date else date_str
+                    entry_price = ab_item.get("entry_price")
+                    current_price = ab_item.get("current_price")
                 all_items[ticker] = {
                     "ticker": ticker,
                     "note": item.get("note", ""),
                     "date_added": date_str,
-                    "entry_price": None,
-                    "current_price": None,
+                    "entry_price": entry_price,
+                    "current_price": current_price,
                     "source": "whatsapp"
                 }
             
-            # Add AlphaBoard watchlist items (with WATCHLIST status) - has more data
-            for item in ab_watchlist:
-                ticker = item.get("ticker", "")
-                if not ticker:
+            # AlphaBoard-only watchlist items (with WATCHLIST status)
+            for ticker, item in ab_by_ticker.items():
+                if ticker in all_items:
                     continue
                 entry_date = item.get("entry_date", "")
-                date_str = entry_date[:10] if entry_date else ""
-                entry_price = item.get("entry_price")
-                current_price = item.get("current_price")
-                
-                # Merge or add
-                if ticker in all_items:
-                    # Update with richer data from AlphaBoard
-                    all_items[ticker].update({
-                        "entry_price": entry_price,
-                        "current_price": current_price,
-                        "date_added": date_str or all_items[ticker]["date_added"]
-                    })
-                else:
-                    all_items[ticker] = {
-                        "ticker": ticker,
-                        "note": "",
-                        "date_added": date_str,
-                        "entry_price": entry_price,
-                        "current_price": current_price,
-                        "source": "alphaboard"
-                    }
+                all_items[ticker] = {
+                    "ticker": ticker,
+                    "note": "",
+                    "date_added": entry_date[:10] if entry_date else "",
+                    "entry_price": item.get("entry_price"),
+                    "current_price": item.get("current_price"),
+                    "source": "alphaboard"
+                }
             
             if not all_items:
                 await self.wa_client.send_text_message(
@@ -448,40 +495,36 @@ class MessageEngine:
             
             lines = ["📋 *Your Watchlist*\n"]
             
+            # Each entry spans several lines; append them straight to `lines`
+            # rather than growing a per-item string with +=
+            append = lines.append
             for i, item in enumerate(watchlist_items[:15], 1):
                 ticker = item["ticker"]
-                date_added = item.get("date_added", "")
-                entry_price = item.get("entry_price")
-                current_price = item.get("current_price")
+                date_added = item["date_added"]
+                entry_price = item["entry_price"]
+                current_price = item["current_price"]
                 
                 # Build line: Ticker
-                line = f"{i}. *{ticker}*"
+                append(f"{i}. *{ticker}*")
                 
                 # Date Added
                 if date_added:
-                    line += f"\n   📅 {date_added}"
+                    append(f"   📅 {date_added}")
                 
                 # Prices and Return
                 if entry_price and current_price:
                     return_pct = ((current_price - entry_price) / entry_price) * 100
                     ret_emoji = "🟢" if return_pct >= 0 else "🔴"
-                    line += f"\n   ₹{entry_price:,.0f} → ₹{current_price:,.0f} | {ret_emoji} {return_pct:+.1f}%"
+                    append(f"   {format_inr(entry_price)} → {format_inr(current_price)} | {ret_emoji} {return_pct:+.1f}%")
                 elif entry_price:
-                    line += f"\n   Entry: ₹{entry_price:,.0f}"
+                    append(f"   Entry: {format_inr(entry_price)}")
                 elif current_price:
-                    line += f"\n   CMP: ₹{current_price:,.0f}"
+                    append(f"   CMP: {format_inr(current_price)}")
                 
                 # Price Alert
-                if ticker in price_alerts:
-                    alert = price_alerts[ticker]
-                    alert_type = alert.get("alert_type", "")
-                    trigger_price = alert.get("trigger_price")
-                    if trigger_price:
-                        # BUY = alert when below, SELL = alert when above
-                        direction = "below" if alert_type == "BUY" else "above"
-                        line += f"\n   🔔 {direction} ₹{float(trigger_price):,.0f}"
-                
-                lines.append(line)
+                alert_line = price_alerts.get(ticker)
+                if alert_line:
+                    append(alert_line)
             
             if len(watchlist_items) > 15:
                 lines.append(f"\n... and {len(watchlist_items) - 15} more")
@@ -491,37 +534,45 @@ class MessageEngine:
             await self.wa_client.send_text_message(phone, "\n".join(lines))
             
         except AlphaBoardClientError as e:
-            logger.error(f"Error fetching watchlist: {e}")
+            logger.error("Error fetching watchlist: %s", e)
             await self._send_error_message(phone)
     
+    async def _start_watchlist_flow(self, phone: str, user_id: str) -> None:
+        """Start the add-to-watchlist flow."""
+        await state_manager.start_flow(user_id, ConversationFlow.ADD_WATCHLIST)
+        await self.wa_client.send_text_message(
+            phone,
+            "👀 *Add to Watchlist*\n\nSend the stock ticker:\n\nExamples:\n• TCS\n• RELIANCE\n• INFY.NS"
+        )
+    
     async def _start_recommendation_flow(self, phone: str, user_id: str) -> None:
         """Start the interactive recommendation flow."""
-        state_manager.start_flow(user_id, ConversationFlow.ADD_RECOMMENDATION)
+        await state_manager.start_flow(user_id, ConversationFlow.ADD_RECOMMENDATION)
         await self.wa_client.send_action_selector(phone)
     
     async def _start_alert_flow(self, phone: str, user_id: str) -> None:
         """Start the price alert flow."""
-        state_manager.start_flow(user_id, ConversationFlow.SET_ALERT)
+        await state_manager.start_flow(user_id, ConversationFlow.SET_ALERT)
         await self.wa_client.send_alert_prompt(phone)
     
     async def _handle_action_selected(self, phone: str, user_id: str, action: str) -> None:
         """Handle action (BUY/SELL/WATCH) selection."""
-        context = state_manager.get_context(user_id)
+        context = await state_manager.get_context(user_id)
         
         if context.flow != ConversationFlow.ADD_RECOMMENDATION:
             # Not in a flow, start one
-            state_manager.start_flow(user_id, ConversationFlow.ADD_RECOMMENDATION)
-            context = state_manager.get_context(user_id)
+            await state_manager.start_flow(user_id, ConversationFlow.ADD_RECOMMENDATION)
+            context = await state_manager.get_context(user_id)
         
-        state_manager.advance_step(user_id, {"action": action})
+        await state_manager.advance_step(user_id, {"action": action})
         await self.wa_client.send_ticker_prompt(phone, action)
     
     async def _handle_thesis_skip(self, phone: str, user_id: str) -> None:
         """Handle thesis skip and complete flow."""
-        context = state_manager.get_context(user_id)
+        context = await state_manager.get_context(user_id)
         
         if context.flow == ConversationFlow.ADD_RECOMMENDATION:
-            data = state_manager.complete_flow(user_id)
+            data = await state_manager.complete_flow(user_id)
             await self._handle_add_recommendation_complete(
                 phone, user_id,
                 data.get("ticker", ""),
@@ -532,7 +583,7 @@ class MessageEngine:
     
     async def _handle_conversation_flow(self, phone: str, user_id: str, text: str) -> None:
         """Handle input during a conversation flow."""
-        context = state_manager.get_context(user_id)
+        context = await state_manager.get_context(user_id)
         
         if context.flow == ConversationFlow.ADD_RECOMMENDATION:
             await self._handle_recommendation_flow_input(phone, user_id, text, context)
@@ -541,7 +592,7 @@ class MessageEngine:
         elif context.flow == ConversationFlow.SET_ALERT:
             await self._handle_alert_flow_input(phone, user_id, text, context)
         else:
-            state_manager.cancel_flow(user_id)
+            await state_manager.cancel_flow(user_id)
             await self._send_fallback_help(phone)
     
     async def _handle_recommendation_flow_input(
@@ -563,15 +614,15 @@ class MessageEngine:
             ticker, price = parsed
             action = context.data.get("action", "BUY")
             
-            state_manager.advance_step(user_id, {"ticker": ticker, "price": price})
+            await state_manager.advance_step(user_id, {"ticker": ticker, "price": price})
             
             # Ask for thesis
             await self.wa_client.send_thesis_prompt(phone, ticker, action, price)
         
         elif step == 3:
             # Waiting for thesis
-            thesis = text.strip() if text.strip().lower() not in ("skip", "none", "-") else None
-            data = state_manager.complete_flow(user_id)
+            thesis = text if text.casefold() not in SKIP_KEYWORDS else None
+            data = await state_manager.complete_flow(user_id)
             
             await self._handle_add_recommendation_complete(
                 phone, user_id,
@@ -594,7 +645,7 @@ class MessageEngine:
             return
         
         ticker, _ = parsed
-        state_manager.complete_flow(user_id)
+        await state_manager.complete_flow(user_id)
         
         await self._handle_add_watchlist(phone, user_id, ticker, None)
     
@@ -603,11 +654,7 @@ class MessageEngine:
     ) -> None:
         """Handle input during alert flow."""
         # Parse alert: "TCS below 3400" or "RELIANCE above 1600" or "TCS @ 3400"
-        alert_pattern = re.compile(
-            r'^([A-Z0-9.]+)\s*(below|above|@|at)?\s*(\d+(?:\.\d+)?)$',
-            re.IGNORECASE
-        )
-        match = alert_pattern.match(text.strip())
+        match = self.ALERT_PATTERN.match(text.strip())
         
         if not match:
             await self.wa_client.send_text_message(
@@ -616,14 +663,14 @@ class MessageEngine:
             )
             return
         
-        ticker = match.group(1).upper()
-        direction_raw = (match.group(2) or "below").lower()
-        price = float(match.group(3))
+        ticker, direction_raw, price_str = match.groups()
+        ticker = ticker.upper()
+        price = float(price_str)
         
-        # Map @ and at to "below" (alert when price drops to level)
-        direction = "below" if direction_raw in ("@", "at", "below") else "above"
+        # Map @ and at (and no direction) to "below" (alert when price drops to level)
+        direction = "above" if direction_raw and direction_raw.lower() == "above" else "below"
         
-        state_manager.complete_flow(user_id)
+        await state_manager.complete_flow(user_id)
         
         try:
             # Create price alert in the proper table
@@ -638,7 +685,7 @@ class MessageEngine:
                 await self.wa_client.send_text_message(
                     phone,
                     f"🔔 *Alert Created!*\n\n"
-                    f"*{ticker}* {direction} ₹{price:,.0f}\n\n"
+                    f"*{ticker}* {direction} {format_inr(price)}\n\n"
                     f"✅ Synced to AlphaBoard app\n"
                     f"📲 You'll get a WhatsApp message when triggered!"
                 )
@@ -646,39 +693,46 @@ class MessageEngine:
                 await self.wa_client.send_text_message(
                     phone,
                     f"⚠️ *Alert Saved Locally*\n\n"
-                    f"*{ticker}* {direction} ₹{price:,.0f}\n\n"
+                    f"*{ticker}* {direction} {format_inr(price)}\n\n"
                     f"❌ Not synced - please *connect* your account first\n"
                     f"Type *connect* to link your AlphaBoard account."
                 )
                 
         except AlphaBoardClientError as e:
-            logger.error(f"Error creating alert: {e}")
+            logger.error("Error creating alert: %s", e)
             await self.wa_client.send_text_message(
                 phone,
                 f"❌ Couldn't create alert. Please try again."
             )
     
+    @staticmethod
+    def _is_valid_flow_ticker(ticker: str) -> bool:
+        """Check an uppercased ticker such as TCS or RELIANCE.NS without a regex."""
+        symbol, dot, exchange = ticker.partition(".")
+        return (
+            ticker.isascii()
+            and 2 <= len(symbol) <= 15
+            and symbol.isalpha()
+            and (not dot or (len(exchange) == 2 and exchange.isalpha()))
+        )
+    
     def _parse_ticker_price(self, text: str) -> Optional[Tuple[str, Optional[float]]]:
         """Parse ticker and optional price from text."""
         text = text.strip()
         
         # Pattern: TICKER @ PRICE or TICKER at PRICE or just TICKER
-        pattern = re.compile(
-            r'^([A-Z0-9.]+)(?:\s*[@at]+\s*(\d+(?:\.\d+)?))?',
-            re.IGNORECASE
-        )
-        match = pattern.match(text)
+        match = self.TICKER_PRICE_PATTERN.match(text)
         
         if not match:
             return None
         
-        ticker = match.group(1).upper()
+        ticker, price_str = match.groups()
+        ticker = ticker.upper()
         
-        # Validate ticker format
-        if not re.match(r'^[A-Z]{2,15}(?:\.[A-Z]{2})?$', ticker):
+        # Validate ticker format: 2-15 letters, optional 2-letter exchange suffix
+        if not self._is_valid_flow_ticker(ticker):
             return None
         
-        price_str = match.group(2)
         price = float(price_str) if price_str else None
         
         return (ticker, price)
@@ -705,7 +759,7 @@ class MessageEngine:
             )
             
         except AlphaBoardClientError as e:
-            logger.error(f"Error adding recommendation: {e}")
+            logger.error("Error adding recommendation: %s", e)
             await self.wa_client.send_text_message(
                 phone,
                 f"❌ Couldn't log recommendation for {ticker}. Please try again."
@@ -725,8 +779,16 @@ class MessageEngine:
     async def _handle_show_recommendations(self, phone: str, user_id: str, show_closed: bool = False) -> None:
         """Handle show recommendations command. Shows OPEN recs by default."""
         try:
-            # Check if account is linked to get AlphaBoard recommendations
-            account_status = await self.ab_client.get_user_account_status(user_id)
+            # Check if account is linked to get AlphaBoard recommendations,
+            # fetching WhatsApp-only recs alongside if not showing closed
+            if show_closed:
+                account_status = await self.ab_client.get_user_account_status(user_id)
+                wa_recs = []
+            else:
+                account_status, wa_recs = await asyncio.gather(
+                    self.ab_client.get_user_account_status(user_id),
+                    self.ab_client.list_recent_recommendations(user_id, days=90),
+                )
             ab_recs = []
             
             if account_status.get("is_linked") and account_status.get("supabase_user_id"):
@@ -739,11 +801,6 @@ class MessageEngine:
                         account_status["supabase_user_id"]
                     )
             
-            # Also get WhatsApp-only recs if not showing closed
-            wa_recs = []
-            if not show_closed:
-                wa_recs = await self.ab_client.list_recent_recommendations(user_id, days=90)
-            
             # Combine recommendations (dedupe by ticker for open positions)
             all_recs = []
             seen_tickers = set()
@@ -809,30 +866,29 @@ class MessageEngine:
             else:
                 lines = ["📊 *Active Recommendations*\n"]
             
+            append = lines.append
             for i, rec in enumerate(all_recs[:10], 1):
-                ticker = rec["ticker"]
-                entry = rec.get("entry_price")
-                cmp = rec.get("current_price")
-                return_pct = rec.get("return_pct") or rec.get("final_return_pct")
-                action = rec.get("action", "BUY")
+                entry = rec["entry_price"]
+                cmp = rec["current_price"]
+                return_pct = rec["return_pct"] or rec.get("final_return_pct")
                 
                 # Format: BUY TICKER @ Entry | CMP | Return%
-                line = f"{i}. *{action} {ticker}*"
+                parts = [f"{i}. *{rec['action']} {rec['ticker']}*"]
                 
                 if entry:
-                    line += f"\n   Entry ₹{entry:,.0f}"
+                    parts.append(f"\n   Entry {format_inr(entry)}")
                     if cmp:
-                        line += f" → CMP ₹{cmp:,.0f}"
+                        parts.append(f" → CMP {format_inr(cmp)}")
                     if return_pct is not None:
                         sign = "+" if return_pct >= 0 else ""
                         emoji = "🟢" if return_pct >= 0 else "🔴"
-                        line += f" | {emoji} {sign}{return_pct:.1f}%"
+                        parts.append(f" | {emoji} {sign}{return_pct:.1f}%")
+                
+                append("".join(parts))
                 
                 # Note if not synced
                 if rec.get("source") == "whatsapp_only":
-                    line += "\n   _(not synced - connect account)_"
-                
-                lines.append(line)
+                    append("   _(not synced - connect account)_")
             
             if len(all_recs) > 10:
                 lines.append(f"\n_...and {len(all_recs) - 10} more_")
@@ -845,9 +901,13 @@ class MessageEngine:
             await self.wa_client.send_text_message(phone, "\n".join(lines))
             
         except AlphaBoardClientError as e:
-            logger.error(f"Error fetching recommendations: {e}")
+            logger.error("Error fetching recommendations: %s", e)
             await self._send_error_message(phone)
     
+    async def _handle_show_history(self, phone: str, user_id: str) -> None:
+        """Handle history command - show closed positions."""
+        await self._handle_show_recommendations(phone, user_id, show_closed=True)
+    
     async def _handle_market_close(self, phone: str, user_id: str) -> None:
         """Handle market close summary request."""
         try:
@@ -855,7 +915,7 @@ class MessageEngine:
             await self.wa_client.send_text_message(phone, summary)
             
         except Exception as e:
-            logger.error(f"Error generating market summary: {e}")
+            logger.error("Error generating market summary: %s", e)
             await self.wa_client.send_text_message(
                 phone,
                 "❌ Couldn't fetch market summary right now. Please try again later."
@@ -889,8 +949,9 @@ class MessageEngine:
                     )
                     return
                 
-                # Get audio and script
-                audio_base64 = result.get("audioBase64")
+                # Get audio and script (popped so the response dict does not keep
+                # the multi-megabyte base64 string alive during the upload)
+                audio_base64 = result.pop("audioBase64", None)
                 script = result.get("script", "")
                 title = result.get("podcastTitle", f"Quick Take: {ticker}")
                 key_points = result.get("keyPoints", [])
@@ -902,28 +963,37 @@ class MessageEngine:
                     for point in key_points[:3]:
                         summary_lines.append(f"• {point}")
                 
-                await self.wa_client.send_text_message(phone, "\n".join(summary_lines))
-                
                 # Send audio if available
                 if audio_base64:
+                    # Send the summary while the audio is decoded and uploaded. It is
+                    # awaited before anything else goes out, so it still arrives first.
+                    summary_task = asyncio.create_task(
+                        self.wa_client.send_text_message(phone, "\n".join(summary_lines))
+                    )
+                    
                     try:
                         import base64
                         audio_bytes = base64.b64decode(audio_base64)
-                        logger.info(f"Decoded audio: {len(audio_bytes)} bytes")
+                        audio_base64 = None  # Only the decoded copy is needed from here
+                        logger.info("Decoded audio: %s bytes", len(audio_bytes))
                         
                         if len(audio_bytes) < 1000:
-                            logger.warning(f"Audio too small: {len(audio_bytes)} bytes")
+                            logger.warning("Audio too small: %s bytes", len(audio_bytes))
                             raise ValueError("Audio file too small")
                         
-                        # Upload and send audio
-                        audio_result = await self.wa_client.upload_and_send_audio(
-                            phone,
+                        upload_result = await self.wa_client.upload_audio(
                             audio_bytes,
                             filename=f"{ticker}_podcast.mp3"
                         )
+                        await summary_task
+                        
+                        if upload_result.get("error"):
+                            audio_result = upload_result
+                        else:
+                            audio_result = await self.wa_client.send_audio_by_id(phone, upload_result["id"])
                         
                         if audio_result.get("error"):
-                            logger.warning(f"Could not send audio: {audio_result}")
+                            logger.warning("Could not send audio: %s", audio_result)
                             # Fallback: send script text
                             if script:
                                 await self.wa_client.send_text_message(
@@ -933,25 +1003,24 @@ class MessageEngine:
                         else:
                             logger.info("Audio sent successfully!")
                     except Exception as audio_err:
-                        logger.error(f"Audio processing error: {audio_err}")
+                        logger.error("Audio processing error: %s", audio_err)
+                        await summary_task
                         if script:
                             await self.wa_client.send_text_message(
                                 phone,
                                 f"🎙️ *Podcast Script:*\n\n_{script[:600]}{'...' if len(script) > 600 else ''}_"
                             )
                 else:
-                    # No audio available - send script as text
+                    # No audio available - send script as text, in the same message
                     logger.warning("No audio in podcast response")
                     if script:
-                        await self.wa_client.send_text_message(
-                            phone,
-                            f"📜 *Script:*\n\n_{script[:800]}{'...' if len(script) > 800 else ''}_"
+                        summary_lines.append(
+                            f"\n📜 *Script:*\n\n_{script[:800]}{'...' if len(script) > 800 else ''}_"
                         )
                     else:
-                        await self.wa_client.send_text_message(
-                            phone,
-                            "⚠️ Podcast generated but no audio or script available."
-                        )
+                        summary_lines.append("\n⚠️ Podcast generated but no audio or script available.")
+                    
+                    await self.wa_client.send_text_message(phone, "\n".join(summary_lines))
                 
                 # Log the request
                 await self.ab_client.request_podcast(user_id, ticker)
@@ -967,7 +1036,7 @@ class MessageEngine:
                 )
             
         except Exception as e:
-            logger.error(f"Error generating podcast: {e}")
+            logger.error("Error generating podcast: %s", e)
             await self.wa_client.send_text_message(
                 phone,
                 "❌ Couldn't generate podcast. Please try again later."
@@ -998,7 +1067,6 @@ class MessageEngine:
                     
                 headline = article.get("headline", "")
                 summary = article.get("summary_tldr", "")
-                sentiment = article.get("sentiment", "neutral")
                 source_url = article.get("source_url", "")
                 
                 # Check if source is credible
@@ -1014,7 +1082,7 @@ class MessageEngine:
                 credible_count += 1
                 
                 # Sentiment emoji
-                emoji = "🟢" if sentiment == "positive" else "🔴" if sentiment == "negative" else "⚪"
+                emoji = SENTIMENT_EMOJI.get(article.get("sentiment"), "⚪")
                 
                 # Format: emoji + headline (truncated)
                 lines.append(f"{emoji} *{headline[:60]}*")
@@ -1044,7 +1112,7 @@ class MessageEngine:
             await self.wa_client.send_text_message(phone, "\n".join(lines))
             
         except Exception as e:
-            logger.error(f"Error fetching news: {e}")
+            logger.error("Error fetching news: %s", e)
             await self.wa_client.send_text_message(
                 phone,
                 f"❌ Couldn't fetch news for {ticker}. Please try again."
@@ -1053,8 +1121,11 @@ class MessageEngine:
     async def _handle_ticker_query(self, phone: str, ticker: str) -> None:
         """Handle standalone ticker query."""
         try:
-            summary = await self.ab_client.get_stock_summary(ticker)
-            price = await self.ab_client.get_stock_price(ticker)
+            # Independent API calls (both return empty values on failure)
+            summary, price = await asyncio.gather(
+                self.ab_client.get_stock_summary(ticker),
+                self.ab_client.get_stock_price(ticker),
+            )
             
             if not summary and not price:
                 await self.wa_client.send_text_message(
@@ -1092,50 +1163,22 @@ class MessageEngine:
             await self.wa_client.send_text_message(phone, response)
             
         except Exception as e:
-            logger.error(f"Error fetching ticker info: {e}")
+            logger.error("Error fetching ticker info: %s", e)
             await self._send_error_message(phone)
     
     # =========================================================================
     # Account Linking Handlers
     # =========================================================================
     
+    @requires_link_state(error_reply=Templates.SIGNUP_PROMPT)
     async def _handle_signup(self, phone: str, user_id: str) -> None:
         """Handle signup command - show signup info."""
-        try:
-            # Check if already linked
-            status = await self.ab_client.get_user_account_status(user_id)
-            
-            if status.get("is_linked"):
-                username = status.get("username", "your account")
-                await self.wa_client.send_text_message(
-                    phone,
-                    Templates.ACCOUNT_ALREADY_LINKED.format(username=username)
-                )
-            else:
-                await self.wa_client.send_text_message(
-                    phone,
-                    Templates.SIGNUP_PROMPT
-                )
-                
-        except AlphaBoardClientError as e:
-            logger.error(f"Error in signup handler: {e}")
-            await self.wa_client.send_text_message(phone, Templates.SIGNUP_PROMPT)
+        await self.wa_client.send_text_message(phone, Templates.SIGNUP_PROMPT)
     
+    @requires_link_state()
     async def _handle_connect_account(self, phone: str, user_id: str) -> None:
         """Handle connect account command - generate link code."""
         try:
-            # Check if already linked
-            status = await self.ab_client.get_user_account_status(user_id)
-            
-            if status.get("is_linked"):
-                username = status.get("username", "your account")
-                await self.wa_client.send_text_message(
-                    phone,
-                    Templates.ACCOUNT_ALREADY_LINKED.format(username=username)
-                )
-                return
-            
-            # Generate link code
             code = await self.ab_client.generate_link_code(user_id)
             
             await self.wa_client.send_text_message(
@@ -1144,59 +1187,27 @@ class MessageEngine:
             )
             
         except AlphaBoardClientError as e:
-            logger.error(f"Error generating link code: {e}")
+            logger.error("Error generating link code: %s", e)
             await self._send_error_message(phone)
     
+    @requires_link_state()
     async def _handle_account_status(self, phone: str, user_id: str) -> None:
         """Handle account status command."""
-        try:
-            status = await self.ab_client.get_user_account_status(user_id)
-            
-            if status.get("is_linked"):
-                username = status.get("username") or status.get("full_name") or "your account"
-                await self.wa_client.send_text_message(
-                    phone,
-                    Templates.ACCOUNT_ALREADY_LINKED.format(username=username)
-                )
-            else:
-                await self.wa_client.send_text_message(
-                    phone,
-                    Templates.ACCOUNT_NOT_LINKED
-                )
-                
-        except AlphaBoardClientError as e:
-            logger.error(f"Error getting account status: {e}")
-            await self._send_error_message(phone)
+        await self.wa_client.send_text_message(phone, Templates.ACCOUNT_NOT_LINKED)
     
     async def _handle_unlink_account(self, phone: str, user_id: str) -> None:
         """Handle unlink account command."""
         try:
-            # Check if linked
-            status = await self.ab_client.get_user_account_status(user_id)
-            
-            if not status.get("is_linked"):
-                await self.wa_client.send_text_message(
-                    phone,
-                    Templates.ACCOUNT_NOT_LINKED
-                )
-                return
-            
-            # Unlink the account
-            self.ab_client.supabase.table("whatsapp_users") \
-                .update({
-                    "supabase_user_id": None,
-                    "onboarding_completed": False
-                }) \
-                .eq("id", user_id) \
-                .execute()
+            # Unlink the account (a no-op that returns False if it wasn't linked)
+            unlinked = await self.ab_client.unlink_supabase_user(user_id)
             
             await self.wa_client.send_text_message(
                 phone,
-                Templates.ACCOUNT_UNLINKED
+                Templates.ACCOUNT_UNLINKED if unlinked else Templates.ACCOUNT_NOT_LINKED
             )
             
         except Exception as e:
-            logger.error(f"Error unlinking account: {e}")
+            logger.error("Error unlinking account: %s", e)
             await self._send_error_message(phone)
     
     # =========================================================================
@@ -1230,7 +1241,7 @@ class MessageEngine:
                 return
             
             # Store org_id in conversation state
-            state_manager.start_flow(
+            await state_manager.start_flow(
                 user_id,
                 ConversationFlow.TRACK_ANALYST,
                 {"organization_id": org_id, "admin_user_id": admin_status.get("user_id")}
@@ -1272,13 +1283,13 @@ class MessageEngine:
                 await self._handle_track_all_organization(phone, user_id)
                 
         except Exception as e:
-            logger.error(f"Error starting admin track: {e}")
+            logger.error("Error starting admin track: %s", e)
             await self._send_error_message(phone)
     
     async def _handle_team_selected(self, phone: str, user_id: str, team_id: str) -> None:
         """Handle team selection in track flow."""
         try:
-            context = state_manager.get_context(user_id)
+            context = await state_manager.get_context(user_id)
             
             if context.flow != ConversationFlow.TRACK_ANALYST:
                 await self._send_fallback_help(phone)
@@ -1292,24 +1303,14 @@ class MessageEngine:
                     phone,
                     "📭 No analysts found in this team."
                 )
-                state_manager.cancel_flow(user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
             # Store team_id
-            state_manager.advance_step(user_id, {"team_id": team_id})
+            await state_manager.advance_step(user_id, {"team_id": team_id})
             
             # Show analyst selection
-            sections = [{
-                "title": "Select Analyst",
-                "rows": [
-                    {
-                        "id": f"analyst_{member['user_id']}",
-                        "title": (member.get("full_name") or member.get("username") or "Unknown")[:24],
-                        "description": f"Role: {member.get('role', 'analyst')}"[:72]
-                    }
-                    for member in members[:10]
-                ]
-            }]
+            sections = self._build_analyst_sections("Select Analyst", members)
             
             await self.wa_client.send_interactive_list(
                 phone,
@@ -1320,25 +1321,28 @@ class MessageEngine:
             )
             
         except Exception as e:
-            logger.error(f"Error handling team selection: {e}")
+            logger.error("Error handling team selection: %s", e)
             await self._send_error_message(phone)
     
     async def _handle_track_all_organization(self, phone: str, user_id: str) -> None:
         """Show all analysts in organization."""
         try:
-            context = state_manager.get_context(user_id)
-            org_id = context.data.get("organization_id")
+            context = await state_manager.get_context(user_id)
             
-            if not org_id:
-                # Try to get org_id again
-                admin_status = await self.ab_client.check_user_is_admin(user_id)
-                org_id = admin_status.get("organization_id")
+            # The organization is stored when the admin check passes in
+            # _handle_admin_track_start; without it the flow has expired
+            if context.flow != ConversationFlow.TRACK_ANALYST:
+                await self._send_fallback_help(phone)
+                return
+            
+            org_id = context.data.get("organization_id")
             
             if not org_id:
                 await self.wa_client.send_text_message(
                     phone,
                     "⚠️ Organization not found. Please try again."
                 )
+                await state_manager.cancel_flow(user_id)
                 return
             
             members = await self.ab_client.get_organization_members(org_id)
@@ -1348,21 +1352,11 @@ class MessageEngine:
                     phone,
                     "📭 No analysts found in your organization."
                 )
-                state_manager.cancel_flow(user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
             # Show all analysts
-            sections = [{
-                "title": "All Analysts",
-                "rows": [
-                    {
-                        "id": f"analyst_{member['id']}",
-                        "title": (member.get("full_name") or member.get("username") or "Unknown")[:24],
-                        "description": f"Role: {member.get('role', 'analyst')}"[:72]
-                    }
-                    for member in members[:10]
-                ]
-            }]
+            sections = self._build_analyst_sections("All Analysts", members)
             
             await self.wa_client.send_interactive_list(
                 phone,
@@ -1373,23 +1367,38 @@ class MessageEngine:
             )
             
         except Exception as e:
-            logger.error(f"Error showing all organization analysts: {e}")
+            logger.error("Error showing all organization analysts: %s", e)
             await self._send_error_message(phone)
     
+    @staticmethod
+    def _build_analyst_sections(title: str, members: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build the interactive list sections for picking one of up to 10 analysts."""
+        return [{
+            "title": title,
+            "rows": [
+                {
+                    "id": f"analyst_{member['user_id']}",
+                    "title": (member.get("full_name") or member.get("username") or "Unknown")[:24],
+                    "description": f"Role: {member.get('role', 'analyst')}"[:72]
+                }
+                for member in members[:10]
+            ]
+        }]
+    
     async def _handle_analyst_selected(self, phone: str, user_id: str, analyst_id: str) -> None:
         """Handle analyst selection - directly show OPEN positions (active recommendations)."""
         try:
-            logger.info(f"🔍 [TRACK ANALYST] Analyst selected: {analyst_id}, showing OPEN positions directly")
-            context = state_manager.get_context(user_id)
-            state_manager.advance_step(user_id, {"analyst_id": analyst_id})
+            logger.info("🔍 [TRACK ANALYST] Analyst selected: %s, showing OPEN positions directly", analyst_id)
+            context = await state_manager.get_context(user_id)
+            await state_manager.advance_step(user_id, {"analyst_id": analyst_id})
             
             # Directly show OPEN positions instead of asking for position type
             await self._handle_show_analyst_recs(phone, user_id, analyst_id, "OPEN")
             
         except Exception as e:
-            logger.error(f"❌ [TRACK ANALYST] Error handling analyst selection: {e}", exc_info=True)
+            logger.error("❌ [TRACK ANALYST] Error handling analyst selection: %s", e, exc_info=True)
             await self._send_error_message(phone)
-            state_manager.cancel_flow(user_id)
+            await state_manager.cancel_flow(user_id)
     
     async def _handle_show_analyst_recs(
         self,
@@ -1404,58 +1413,53 @@ class MessageEngine:
         This method queries public.recommendations directly using the analyst's Supabase UUID.
         """
         try:
-            logger.info(f"🔍 [TRACK ANALYST] Starting flow - analyst_id={analyst_id}, status={status}, whatsapp_user_id={user_id}")
+            logger.info("🔍 [TRACK ANALYST] Starting flow - analyst_id=%s, status=%s, whatsapp_user_id=%s", analyst_id, status, user_id)
             
             # CRITICAL: Verify analyst_id is a valid Supabase UUID format
             # UUID format: 8-4-4-4-12 hex characters
             import re
             uuid_pattern = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
             if not uuid_pattern.match(analyst_id):
-                logger.error(f"❌ [TRACK ANALYST] Invalid analyst_id format: {analyst_id}. Expected Supabase UUID.")
+                logger.error("❌ [TRACK ANALYST] Invalid analyst_id format: %s. Expected Supabase UUID.", analyst_id)
                 await self.wa_client.send_text_message(
                     phone,
                     "❌ *Error*\n\nInvalid analyst ID format.\n\nPlease try selecting the analyst again."
                 )
-                state_manager.cancel_flow(user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
             # Verify admin still has access and get organization context
-            context = state_manager.get_context(user_id)
+            context = await state_manager.get_context(user_id)
             admin_org_id = context.data.get("organization_id") if context else None
-            logger.info(f"🔍 [TRACK ANALYST] Admin org_id: {admin_org_id}")
+            logger.info("🔍 [TRACK ANALYST] Admin org_id: %s", admin_org_id)
             
             # Get analyst profile from public.profiles table (NOT whatsapp_users)
             # This confirms the analyst_id is a valid Supabase UUID
-            logger.info(f"🔍 [TRACK ANALYST] Querying public.profiles table for UUID: {analyst_id}")
+            logger.info("🔍 [TRACK ANALYST] Querying public.profiles table for UUID: %s", analyst_id)
             try:
-                profile_result = self.ab_client.supabase.table("profiles") \
-                    .select("id, username, full_name, organization_id") \
-                    .eq("id", analyst_id) \
-                    .limit(1) \
-                    .execute()
+                profile = await self.ab_client.get_profile(analyst_id, "id, username, full_name, organization_id")
                 
-                logger.info(f"🔍 [TRACK ANALYST] Profile query result: {len(profile_result.data) if profile_result.data else 0} rows")
+                logger.info("🔍 [TRACK ANALYST] Profile query result: %s rows", 1 if profile else 0)
             except Exception as profile_error:
-                logger.error(f"❌ [TRACK ANALYST] Error querying profiles table: {profile_error}", exc_info=True)
+                logger.error("❌ [TRACK ANALYST] Error querying profiles table: %s", profile_error, exc_info=True)
                 await self.wa_client.send_text_message(
                     phone,
                     "❌ *Error*\n\nFailed to fetch analyst profile.\n\nPlease try again or contact support."
                 )
-                state_manager.cancel_flow(user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
             analyst_name = "Analyst"
             analyst_org_id = None
             analyst_supabase_uuid = None
             
-            if profile_result.data and len(profile_result.data) > 0:
-                profile = profile_result.data[0]
+            if profile:
                 analyst_supabase_uuid = profile.get("id")  # This is the Supabase UUID
                 analyst_name = profile.get("full_name") or profile.get("username") or "Analyst"
                 analyst_org_id = profile.get("organization_id")
-                logger.info(f"✅ [TRACK ANALYST] Found analyst: {analyst_name} | UUID: {analyst_supabase_uuid} | org_id: {analyst_org_id}")
+                logger.info("✅ [TRACK ANALYST] Found analyst: %s | UUID: %s | org_id: %s", analyst_name, analyst_supabase_uuid, analyst_org_id)
             else:
-                logger.error(f"❌ [TRACK ANALYST] Analyst profile NOT FOUND in public.profiles for UUID: {analyst_id}")
+                logger.error("❌ [TRACK ANALYST] Analyst profile NOT FOUND in public.profiles for UUID: %s", analyst_id)
                 await self.wa_client.send_text_message(
                     phone,
                     f"❌ *Analyst Not Found*\n\n"
@@ -1463,50 +1467,57 @@ class MessageEngine:
                     f"Analyst ID: {analyst_id[:8]}...\n\n"
                     f"Please try selecting the analyst again."
                 )
-                state_manager.cancel_flow(user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
             # Also check membership table for organization
             if not analyst_org_id:
-                membership_result = self.ab_client.supabase.table("user_organization_membership") \
+                query = self.ab_client.supabase.table("user_organization_membership") \
                     .select("organization_id") \
                     .eq("user_id", analyst_supabase_uuid) \
-                    .limit(1) \
-                    .execute()
+                    .limit(1)
+                membership_result = await asyncio.to_thread(query.execute)
                 
                 if membership_result.data and len(membership_result.data) > 0:
                     analyst_org_id = membership_result.data[0].get("organization_id")
-                    logger.info(f"Found analyst organization from membership: {analyst_org_id}")
+                    logger.info("Found analyst organization from membership: %s", analyst_org_id)
             
             # Verify analyst is in admin's organization
             if admin_org_id and analyst_org_id and admin_org_id != analyst_org_id:
-                logger.warning(f"Analyst {analyst_supabase_uuid} (org: {analyst_org_id}) not in admin's org: {admin_org_id}")
+                logger.warning("Analyst %s (org: %s) not in admin's org: %s", analyst_supabase_uuid, analyst_org_id, admin_org_id)
                 await self.wa_client.send_text_message(
                     phone,
                     f"⚠️ *Access Denied*\n\n"
                     f"This analyst is not in your organization."
                 )
-                state_manager.cancel_flow(user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
+            # Access is confirmed, so start the performance query alongside the
+            # recommendations; both are keyed by the profile's own UUID, which
+            # the lookups below use too
+            status_filter = None if status == "ALL" else status
+            await self.ab_client.prefetch_analyst_bundle(analyst_supabase_uuid, status_filter, ANALYST_RECS_SHOWN + 1)
+            
             # Get recommendations - DIRECT query to public.recommendations using Supabase UUID
             # DO NOT query whatsapp_users table - recommendations are in public.recommendations
-            status_filter = None if status == "ALL" else status
-            logger.info(f"🔍 [TRACK ANALYST] Fetching recommendations from public.recommendations")
-            logger.info(f"🔍 [TRACK ANALYST] Supabase User ID: {analyst_supabase_uuid}")
-            logger.info(f"🔍 [TRACK ANALYST] Status filter: {status_filter}")
+            logger.info("🔍 [TRACK ANALYST] Fetching recommendations from public.recommendations")
+            logger.info("🔍 [TRACK ANALYST] Supabase User ID: %s", analyst_supabase_uuid)
+            logger.info("🔍 [TRACK ANALYST] Status filter: %s", status_filter)
             
             recs = []
             try:
                 # Query public.recommendations directly using the analyst's Supabase UUID
-                logger.info(f"🔍 [TRACK ANALYST] Calling get_analyst_recommendations_detailed(user_id={analyst_supabase_uuid}, status={status_filter})")
-                recs = await self.ab_client.get_analyst_recommendations_detailed(analyst_supabase_uuid, status_filter)
-                logger.info(f"✅ [TRACK ANALYST] Retrieved {len(recs)} recommendations for analyst {analyst_supabase_uuid}")
+                logger.info("🔍 [TRACK ANALYST] Calling get_analyst_recommendations_detailed(user_id=%s, status=%s)", analyst_supabase_uuid, status_filter)
+                recs = await self.ab_client.get_analyst_recommendations_detailed(
+                    analyst_supabase_uuid, status_filter, ANALYST_RECS_SHOWN + 1
+                )
+                logger.info("✅ [TRACK ANALYST] Retrieved %s recommendations for analyst %s", len(recs), analyst_supabase_uuid)
             except AlphaBoardClientError as e:
-                logger.error(f"❌ [TRACK ANALYST] AlphaBoardClientError getting recommendations: {e}", exc_info=True)
+                logger.error("❌ [TRACK ANALYST] AlphaBoardClientError getting recommendations: %s", e, exc_info=True)
                 # Fall through to direct query fallback
             except Exception as e:
-                logger.error(f"❌ [TRACK ANALYST] Unexpected error getting recommendations: {e}", exc_info=True)
+                logger.error("❌ [TRACK ANALYST] Unexpected error getting recommendations: %s", e, exc_info=True)
                 # Fall through to direct query fallback
             
             # If no results, try direct query without going through the method
@@ -1520,16 +1531,16 @@ class MessageEngine:
                     
                     # CRITICAL: Direct query to public.recommendations using Supabase UUID
                     # DO NOT query whatsapp_users - recommendations are in public.recommendations
-                    logger.info(f"Direct query to public.recommendations for user_id={analyst_supabase_uuid}")
-                    direct_result = self.ab_client.supabase.table("recommendations") \
+                    logger.info("Direct query to public.recommendations for user_id=%s", analyst_supabase_uuid)
+                    query = self.ab_client.supabase.table("recommendations") \
                         .select("*") \
                         .eq("user_id", analyst_supabase_uuid) \
                         .order("entry_date", desc=True) \
-                        .limit(50) \
-                        .execute()
+                        .limit(50)
+                    direct_result = await asyncio.to_thread(query.execute)
                     
                     if direct_result.data:
-                        logger.info(f"Direct query returned {len(direct_result.data)} recommendations")
+                        logger.info("Direct query returned %s recommendations", len(direct_result.data))
                         # Convert to expected format
                         recs = []
                         for rec in direct_result.data:
@@ -1558,32 +1569,32 @@ class MessageEngine:
                                 "final_return_pct": rec.get("final_return_pct"),
                                 "thesis": rec.get("thesis")
                             })
-                        logger.info(f"Converted {len(recs)} recommendations after status filter")
+                        logger.info("Converted %s recommendations after status filter", len(recs))
                 except Exception as direct_error:
-                    logger.error(f"Direct query also failed: {direct_error}", exc_info=True)
+                    logger.error("Direct query also failed: %s", direct_error, exc_info=True)
             
             # Get performance stats using Supabase UUID
             performance = await self.ab_client.get_analyst_performance(analyst_supabase_uuid)
             
             if not recs:
-                logger.warning(f"⚠️ [TRACK ANALYST] No recommendations found for analyst {analyst_supabase_uuid}")
+                logger.warning("⚠️ [TRACK ANALYST] No recommendations found for analyst %s", analyst_supabase_uuid)
                 status_label = status.lower() if status != "ALL" else "positions"
                 
                 # Check if analyst has ANY recommendations in public.recommendations
                 try:
-                    logger.info(f"🔍 [TRACK ANALYST] Checking for ANY recommendations for Supabase UUID: {analyst_supabase_uuid}")
-                    any_recs = self.ab_client.supabase.table("recommendations") \
+                    logger.info("🔍 [TRACK ANALYST] Checking for ANY recommendations for Supabase UUID: %s", analyst_supabase_uuid)
+                    query = self.ab_client.supabase.table("recommendations") \
                         .select("status, ticker") \
                         .eq("user_id", analyst_supabase_uuid) \
-                        .limit(10) \
-                        .execute()
+                        .limit(10)
+                    any_recs = await asyncio.to_thread(query.execute)
                     
-                    logger.info(f"🔍 [TRACK ANALYST] Any recommendations check returned: {len(any_recs.data) if any_recs.data else 0} rows")
+                    logger.info("🔍 [TRACK ANALYST] Any recommendations check returned: %s rows", len(any_recs.data) if any_recs.data else 0)
                     
                     if any_recs.data and len(any_recs.data) > 0:
                         statuses = set([r.get("status") for r in any_recs.data if r.get("status")])
                         tickers = [r.get("ticker") for r in any_recs.data[:5]]
-                        logger.info(f"🔍 [TRACK ANALYST] Analyst has recommendations with statuses: {statuses}, sample tickers: {tickers}")
+                        logger.info("🔍 [TRACK ANALYST] Analyst has recommendations with statuses: %s, sample tickers: %s", statuses, tickers)
                         
                         status_list = ', '.join(sorted(statuses)) if statuses else 'None'
                         await self.wa_client.send_text_message(
@@ -1594,7 +1605,7 @@ class MessageEngine:
                             f"Try selecting a different position type."
                         )
                     else:
-                        logger.warning(f"⚠️ [TRACK ANALYST] Analyst {analyst_supabase_uuid} has NO recommendations at all in database")
+                        logger.warning("⚠️ [TRACK ANALYST] Analyst %s has NO recommendations at all in database", analyst_supabase_uuid)
                         await self.wa_client.send_text_message(
                             phone,
                             f"📭 *{analyst_name}*\n\n"
@@ -1603,7 +1614,7 @@ class MessageEngine:
                             f"Supabase User ID: {analyst_supabase_uuid}"
                         )
                 except Exception as check_error:
-                    logger.error(f"❌ [TRACK ANALYST] Error checking for any recommendations: {check_error}", exc_info=True)
+                    logger.error("❌ [TRACK ANALYST] Error checking for any recommendations: %s", check_error, exc_info=True)
                     await self.wa_client.send_text_message(
                         phone,
                         f"❌ *Error*\n\n"
@@ -1614,8 +1625,8 @@ class MessageEngine:
                     )
                 
                 # ALWAYS cancel flow after sending message
-                logger.info(f"🔍 [TRACK ANALYST] Cancelling flow for user {user_id}")
-                state_manager.cancel_flow(user_id)
+                logger.info("🔍 [TRACK ANALYST] Cancelling flow for user %s", user_id)
+                await state_manager.cancel_flow(user_id)
                 return
             
             # Build detailed output
@@ -1646,15 +1657,16 @@ class MessageEngine:
             # Table header explanation
             lines.append("*Entry* → *CMP* | *Return* | *Target*\n")
             
-            logger.info(f"Building message for {len(recs)} recommendations")
+            logger.info("Building message for %s recommendations", len(recs))
             
-            for i, rec in enumerate(recs[:15], 1):
+            for i, rec in enumerate(recs[:ANALYST_RECS_SHOWN], 1):
                 ticker = rec.get("ticker", "???")
                 action = rec.get("action", "BUY")
                 entry_price = rec.get("entry_price")
                 current_price = rec.get("current_price")
                 target_price = rec.get("target_price")
                 return_pct = rec.get("return_pct")
+                final_return_pct = rec.get("final_return_pct")
                 entry_date = rec.get("entry_date", "")[:10]  # YYYY-MM-DD
                 rec_status = rec.get("status", "OPEN")
                 
@@ -1662,52 +1674,55 @@ class MessageEngine:
                 action_emoji = "🟢" if action == "BUY" else "🔴" if action == "SELL" else "👀"
                 
                 # Build line
-                line = f"{i}. {action_emoji} *{action} {ticker}*"
+                parts = [f"{i}. {action_emoji} *{action} {ticker}*"]
                 
                 # Date
                 if entry_date:
-                    line += f"\n   📅 {entry_date}"
+                    parts.append(f"\n   📅 {entry_date}")
                 
                 # Prices
                 if entry_price:
-                    line += f"\n   ₹{entry_price:,.0f}"
+                    parts.append(f"\n   {format_inr(entry_price)}")
                     if current_price:
-                        line += f" → ₹{current_price:,.0f}"
+                        parts.append(f" → {format_inr(current_price)}")
                 
                 # Return
                 if return_pct is not None:
                     ret_emoji = "🟢" if return_pct >= 0 else "🔴"
-                    line += f" | {ret_emoji} {return_pct:+.1f}%"
-                elif rec.get("final_return_pct") is not None:
-                    final_ret = rec["final_return_pct"]
-                    ret_emoji = "🟢" if final_ret >= 0 else "🔴"
-                    line += f" | {ret_emoji} {final_ret:+.1f}% (final)"
+                    parts.append(f" | {ret_emoji} {return_pct:+.1f}%")
+                elif final_return_pct is not None:
+                    ret_emoji = "🟢" if final_return_pct >= 0 else "🔴"
+                    parts.append(f" | {ret_emoji} {final_return_pct:+.1f}% (final)")
                 
                 # Target
                 if target_price:
-                    line += f"\n   🎯 Target: ₹{target_price:,.0f}"
+                    parts.append(f"\n   🎯 Target: {format_inr(target_price)}")
                 
                 # Status indicator for closed
                 if rec_status == "CLOSED":
                     exit_price = rec.get("exit_price")
                     if exit_price:
-                        line += f"\n   ❌ Exited @ ₹{exit_price:,.0f}"
+                        parts.append(f"\n   ❌ Exited @ {format_inr(exit_price)}")
                 
-                lines.append(line + "\n")
+                parts.append("\n")
+                lines.append("".join(parts))
             
-            if len(recs) > 15:
-                lines.append(f"\n... and {len(recs) - 15} more positions")
+            if len(recs) > ANALYST_RECS_SHOWN:
+                total = await self.ab_client.get_analyst_recommendations_detailed(
+                    analyst_supabase_uuid, status_filter, only_count=True
+                )
+                lines.append(f"\n... and {max(total, len(recs)) - ANALYST_RECS_SHOWN} more positions")
             
             # Send message FIRST, then cancel flow
             message_text = "\n".join(lines)
-            logger.info(f"🔍 [TRACK ANALYST] Sending recommendations message ({len(message_text)} chars, {len(recs)} recommendations)")
-            logger.info(f"🔍 [TRACK ANALYST] Analyst Supabase UUID: {analyst_supabase_uuid}")
+            logger.info("🔍 [TRACK ANALYST] Sending recommendations message (%s chars, %s recommendations)", len(message_text), len(recs))
+            logger.info("🔍 [TRACK ANALYST] Analyst Supabase UUID: %s", analyst_supabase_uuid)
             
             try:
                 await self.wa_client.send_text_message(phone, message_text)
-                logger.info(f"✅ [TRACK ANALYST] Successfully sent recommendations message to {phone}")
+                logger.info("✅ [TRACK ANALYST] Successfully sent recommendations message to %s", phone)
             except Exception as send_error:
-                logger.error(f"❌ [TRACK ANALYST] Failed to send message: {send_error}", exc_info=True)
+                logger.error("❌ [TRACK ANALYST] Failed to send message: %s", send_error, exc_info=True)
                 # Still cancel flow even if message send fails
                 # Try to send error message
                 try:
@@ -1719,12 +1734,12 @@ class MessageEngine:
                     pass  # If we can't send error message, just log it
             
             # ALWAYS cancel flow after sending (or attempting to send) message
-            logger.info(f"🔍 [TRACK ANALYST] Cancelling flow for user {user_id}")
-            state_manager.cancel_flow(user_id)
-            logger.info(f"✅ [TRACK ANALYST] Flow completed and cancelled for user {user_id}")
+            logger.info("🔍 [TRACK ANALYST] Cancelling flow for user %s", user_id)
+            await state_manager.cancel_flow(user_id)
+            logger.info("✅ [TRACK ANALYST] Flow completed and cancelled for user %s", user_id)
             
         except Exception as e:
-            logger.error(f"❌ [TRACK ANALYST] Exception in _handle_show_analyst_recs: {e}", exc_info=True)
+            logger.error("❌ [TRACK ANALYST] Exception in _handle_show_analyst_recs: %s", e, exc_info=True)
             error_msg = str(e)
             
             # Provide user-friendly error message
@@ -1752,17 +1767,33 @@ class MessageEngine:
             try:
                 await self.wa_client.send_text_message(phone, user_error)
             except Exception as send_err:
-                logger.error(f"❌ [TRACK ANALYST] Failed to send error message: {send_err}")
+                logger.error("❌ [TRACK ANALYST] Failed to send error message: %s", send_err)
             
             # ALWAYS cancel flow on error
-            logger.info(f"🔍 [TRACK ANALYST] Cancelling flow after error for user {user_id}")
-            state_manager.cancel_flow(user_id)
-            logger.info(f"✅ [TRACK ANALYST] Flow cancelled after error")
+            logger.info("🔍 [TRACK ANALYST] Cancelling flow after error for user %s", user_id)
+            await state_manager.cancel_flow(user_id)
+            logger.info("✅ [TRACK ANALYST] Flow cancelled after error")
     
     # =========================================================================
     # Helper Methods
     # =========================================================================
     
+    async def _send_main_menu(self, phone: str, user_id: str) -> None:
+        """Send the interactive main menu."""
+        await self.wa_client.send_main_menu(phone)
+    
+    async def _send_news_prompt(self, phone: str, user_id: str) -> None:
+        """Ask which ticker to fetch news for."""
+        await self.wa_client.send_text_message(phone, Templates.NEWS_PROMPT)
+    
+    async def _send_podcast_prompt(self, phone: str, user_id: str) -> None:
+        """Ask what the podcast should cover."""
+        await self.wa_client.send_text_message(phone, Templates.PODCAST_PROMPT)
+    
+    async def _send_help_text(self, phone: str, user_id: str) -> None:
+        """Send the full help text."""
+        await self.wa_client.send_text_message(phone, Templates.HELP_MESSAGE)
+    
     async def _send_help_message(self, phone: str) -> None:
         """Send help message to user."""
         await self.wa_client.send_text_message(phone, Templates.HELP_MESSAGE)
@@ -1775,3 +1806,19 @@ class MessageEngine:
         """Send generic error message."""
         await self.wa_client.send_text_message(phone, Templates.ERROR_MESSAGE)
 
+
+# Resolve routes to MessageEngine functions once at import time; the engine is
+# created per message, so binding them per instance would redo this on every
+# message.
+_KEYWORD_HANDLERS: Dict[str, Callable[..., Awaitable[None]]] = {
+    keyword: getattr(MessageEngine, handler_name)
+    for keyword, handler_name in KEYWORD_ROUTES.items()
+}
+_INTERACTIVE_HANDLERS: Dict[str, Callable[..., Awaitable[None]]] = {
+    reply_id: getattr(MessageEngine, handler_name)
+    for reply_id, handler_name in INTERACTIVE_ROUTES.items()
+}
+_INTERACTIVE_PREFIX_HANDLERS: Tuple[Tuple[str, Callable[..., Awaitable[None]]], ...] = tuple(
+    (prefix, getattr(MessageEngine, handler_name))
+    for prefix, handler_name in INTERACTIVE_PREFIX_ROUTES
+)
@@ -0,0 +1,35 @@
+"""
+Shared HTTP Client.
+One HTTP/2 connection pool for WhatsApp, AlphaBoard, market data and news calls.
+"""
+
+from typing import Optional
+import httpx
+
+
+# The bot's clients are instantiated per message, so the connection pool lives
+# at module level to keep connections (and TLS sessions) alive across instances.
+# Callers pass their own headers and, where needed, a per-request timeout.
+# Idle connections are kept for 30s (httpx defaults to 5s) so the gaps between
+# a user's messages, or between market-summary calls, don't cost a new handshake.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP/2 client."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(5.0, connect=2.0)
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client. Called on application shutdown."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
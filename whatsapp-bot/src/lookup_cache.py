@@ -0,0 +1,91 @@
+"""
+Lookup Cache.
+Short-lived caches for per-user Supabase lookups (account link status,
+admin role) that most commands repeat before doing any work.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Protocol, Tuple
+
+from .config import Settings
+from .redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class LookupCache(Protocol):
+    """TTL cache of JSON-serialisable dicts, keyed by WhatsApp user ID."""
+    
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        ...
+    
+    async def set(self, user_id: str, value: Dict[str, Any]) -> None:
+        ...
+    
+    async def delete(self, user_id: str) -> None:
+        ...
+
+
+class InMemoryLookupCache:
+    """
+    Process-local cache (suitable for single-instance deployment).
+    
+    Entries are kept in write order and capped at max_size, evicting the
+    oldest first. Callers get a copy, so mutating a result cannot change
+    what later lookups see.
+    """
+    
+    def __init__(self, ttl_seconds: int, max_size: int = 10_000):
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._ttl_seconds = ttl_seconds
+        self._max_size = max_size
+    
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        cached = self._entries.get(user_id)
+        if cached and time.monotonic() - cached[0] < self._ttl_seconds:
+            return dict(cached[1])
+        return None
+    
+    async def set(self, user_id: str, value: Dict[str, Any]) -> None:
+        self._entries[user_id] = (time.monotonic(), dict(value))
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+    
+    async def delete(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+
+class RedisLookupCache:
+    """
+    Redis-backed cache, so an invalidation on one worker reaches them all.
+    
+    Each value is a JSON string at {prefix}{user_id}, written with SETEX so
+    Redis expires it itself. Takes a `redis.asyncio` client (see
+    get_redis_client), so cache lookups never block the event loop.
+    """
+    
+    def __init__(self, redis_client: Any, key_prefix: str, ttl_seconds: int):
+        self._redis = redis_client
+        self._key_prefix = key_prefix
+        self._ttl_seconds = ttl_seconds
+    
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(self._key_prefix + user_id)
+        return json.loads(raw) if raw else None
+    
+    async def set(self, user_id: str, value: Dict[str, Any]) -> None:
+        await self._redis.setex(self._key_prefix + user_id, self._ttl_seconds, json.dumps(value))
+    
+    async def delete(self, user_id: str) -> None:
+        await self._redis.delete(self._key_prefix + user_id)
+
+
+def create_lookup_cache(settings: Settings, key_prefix: str, ttl_seconds: int) -> LookupCache:
+    """Use Redis when REDIS_URL is configured, otherwise cache in memory."""
+    if settings.REDIS_URL:
+        return RedisLookupCache(get_redis_client(settings.REDIS_URL), key_prefix, ttl_seconds)
+    return InMemoryLookupCache(ttl_seconds)
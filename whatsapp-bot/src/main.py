@@ -4,13 +4,17 @@ FastAPI application entrypoint.
 """
 
 import os
+import json
 import logging
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from .config import get_settings
+from .http_client import close_http_client
+from .redis_client import close_redis_client
 from .webhook import router as webhook_router
 from .admin import router as admin_router, api_router
 
@@ -22,16 +26,23 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Lazy settings loading - only load when actually needed
-_settings = None
-
+@lru_cache()
 def get_app_settings():
-    """Get settings instance, loading it lazily on first access."""
-    global _settings
-    if _settings is None:
-        _settings = get_settings()
-        # Update logging level after settings are loaded
-        logging.getLogger().setLevel(getattr(logging, _settings.LOG_LEVEL))
-    return _settings
+    """Get the shared settings instance and apply its log level on first access."""
+    settings = get_settings()
+    # Update logging level after settings are loaded
+    logging.getLogger().setLevel(getattr(logging, settings.LOG_LEVEL))
+    return settings
+
+
+# Settings the bot cannot serve messages without; checked once at startup
+REQUIRED_SETTINGS = (
+    "META_WHATSAPP_ACCESS_TOKEN",
+    "META_WHATSAPP_PHONE_NUMBER_ID",
+    "META_WHATSAPP_VERIFY_TOKEN",
+    "SUPABASE_URL",
+    "SUPABASE_SERVICE_ROLE_KEY",
+)
 
 
 @asynccontextmanager
@@ -47,17 +58,7 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting WhatsApp Bot Service (env={settings.ENVIRONMENT})")
     
     # Validate required settings (warn if missing, but don't fail)
-    missing_settings = []
-    if not settings.META_WHATSAPP_ACCESS_TOKEN:
-        missing_settings.append("META_WHATSAPP_ACCESS_TOKEN")
-    if not settings.META_WHATSAPP_PHONE_NUMBER_ID:
-        missing_settings.append("META_WHATSAPP_PHONE_NUMBER_ID")
-    if not settings.META_WHATSAPP_VERIFY_TOKEN:
-        missing_settings.append("META_WHATSAPP_VERIFY_TOKEN")
-    if not settings.SUPABASE_URL:
-        missing_settings.append("SUPABASE_URL")
-    if not settings.SUPABASE_SERVICE_ROLE_KEY:
-        missing_settings.append("SUPABASE_SERVICE_ROLE_KEY")
+    missing_settings = [name for name in REQUIRED_SETTINGS if not getattr(settings, name)]
     
     if missing_settings:
         logger.warning(f"⚠️ Missing environment variables: {', '.join(missing_settings)}")
@@ -70,6 +71,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down WhatsApp Bot Service")
+    await close_http_client()
+    await close_redis_client()
 
 
 # Create FastAPI application
@@ -86,10 +89,20 @@ app = FastAPI(
     redoc_url="/redoc" if enable_docs else None,
 )
 
-# Add CORS middleware
+# Add CORS middleware. The web app calls the /api routes from the browser, so
+# CORS stays on in production; set CORS_ALLOWED_ORIGINS (comma-separated, in
+# the environment or .env) to the web app's origin(s) to stop allowing every
+# site. Server-to-server webhook calls carry no Origin header and pass
+# straight through.
+cors_origins = [
+    origin.strip()
+    for origin in get_settings().CORS_ALLOWED_ORIGINS.split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -107,21 +120,27 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Health check bodies never change, so they are encoded once instead of being
+# serialized by FastAPI on every load balancer probe
+ROOT_RESPONSE_BODY = json.dumps({
+    "status": "ok",
+    "service": "AlphaBoard WhatsApp Bot",
+    "version": "1.0.0"
+}).encode()
+HEALTH_RESPONSE_BODY = json.dumps({"status": "healthy"}).encode()
+
+
 # Health check endpoint
 @app.get("/")
 async def root():
     """Root endpoint - basic health check."""
-    return {
-        "status": "ok",
-        "service": "AlphaBoard WhatsApp Bot",
-        "version": "1.0.0"
-    }
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint for load balancers."""
-    return {"status": "healthy"}
+    return Response(content=HEALTH_RESPONSE_BODY, media_type="application/json")
 
 
 # Include routers
@@ -136,11 +155,23 @@ def main():
     import uvicorn
     
     settings = get_app_settings()
+    
+    # Reload mode runs a single process; otherwise fan out across workers, but
+    # only when conversation state lives in Redis - in-memory flows would be
+    # split between processes and lose their next step.
+    workers = 1
+    if not settings.is_development and settings.WORKERS > 1:
+        if settings.REDIS_URL:
+            workers = settings.WORKERS
+        else:
+            logger.warning(f"⚠️ WORKERS={settings.WORKERS} ignored: REDIS_URL is required for multiple workers")
+    
     uvicorn.run(
         "src.main:app",
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.is_development,
+        workers=workers,
         log_level=settings.LOG_LEVEL.lower()
     )
 
@@ -0,0 +1,33 @@
+"""
+Shared Redis Client.
+One asyncio Redis connection pool for conversation state and lookup caches.
+"""
+
+from typing import Any, Optional
+
+
+# Created on first use, so deployments without REDIS_URL never import redis.
+# Commands are awaited on the event loop instead of blocking it, so a slow
+# Redis round trip only delays the message that is waiting on it.
+_redis_client: Optional[Any] = None
+
+
+def get_redis_client(redis_url: str) -> Any:
+    """Get or create the shared `redis.asyncio` client."""
+    global _redis_client
+    if _redis_client is None:
+        from redis.asyncio import Redis
+        
+        _redis_client = Redis.from_url(redis_url, decode_responses=True)
+    return _redis_client
+
+
+async def close_redis_client() -> None:
+    """
+    Drop the shared client's connections. Called on shutdown.
+    
+    The stores hold on to the client itself, so it is kept and reconnects
+    on its next command (for example from a later event loop).
+    """
+    if _redis_client is not None:
+        await _redis_client.connection_pool.disconnect()
@@ -5,7 +5,7 @@ Defines schemas for incoming messages, API payloads, and responses.
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import UUID
 
 
@@ -15,84 +15,88 @@ from uuid import UUID
 
 class WhatsAppTextMessage(BaseModel):
     """Text message content from WhatsApp."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     body: str
 
 
 class WhatsAppInteractiveReply(BaseModel):
     """Interactive reply (button/list) from WhatsApp."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     id: str
     title: str
 
 
 class WhatsAppInteractive(BaseModel):
     """Interactive message content from WhatsApp."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     type: str  # "button_reply" or "list_reply"
     button_reply: Optional[WhatsAppInteractiveReply] = None
     list_reply: Optional[WhatsAppInteractiveReply] = None
-    
-    class Config:
-        extra = "ignore"
 
 
 class WhatsAppMessage(BaseModel):
     """Parsed incoming WhatsApp message."""
+    model_config = ConfigDict(populate_by_name=True, extra="ignore", frozen=True)
+    
     message_id: str = Field(alias="id")
     from_phone: str = Field(alias="from")
     timestamp: str
     type: str  # "text", "interactive", "image", etc.
     text: Optional[WhatsAppTextMessage] = None
     interactive: Optional[WhatsAppInteractive] = None
-    
-    class Config:
-        populate_by_name = True
-        extra = "ignore"  # Ignore extra fields like context, errors, etc.
 
 
 class WhatsAppContact(BaseModel):
     """Contact information from WhatsApp."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     wa_id: str
     profile: Optional[Dict[str, Any]] = None
-    
-    class Config:
-        extra = "ignore"  # Ignore extra fields from WhatsApp
 
 
 class WhatsAppMetadata(BaseModel):
     """Metadata from WhatsApp webhook."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     display_phone_number: str
     phone_number_id: str
-    
-    class Config:
-        extra = "ignore"
 
 
 class WhatsAppValue(BaseModel):
     """Value object from WhatsApp webhook."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     messaging_product: str
     metadata: WhatsAppMetadata
     contacts: Optional[List[WhatsAppContact]] = None
     messages: Optional[List[WhatsAppMessage]] = None
     statuses: Optional[List[Dict[str, Any]]] = None  # Message status updates
     errors: Optional[List[Dict[str, Any]]] = None
-    
-    class Config:
-        extra = "ignore"
 
 
 class WhatsAppChange(BaseModel):
     """Change object from WhatsApp webhook."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     value: WhatsAppValue
     field: str
 
 
 class WhatsAppEntry(BaseModel):
     """Entry object from WhatsApp webhook."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     id: str
     changes: List[WhatsAppChange]
 
 
 class WhatsAppWebhookPayload(BaseModel):
     """Full WhatsApp webhook payload."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     object: str
     entry: List[WhatsAppEntry]
 
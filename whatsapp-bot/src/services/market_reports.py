@@ -3,15 +3,40 @@ Market Report Service.
 Builds daily market close summaries and personalized reports.
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional
-import httpx
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 from ..config import Settings
+from ..http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=8)
+def format_report_date(day: date, fmt: str = "%B %d, %Y") -> str:
+    """
+    Format a report date, e.g. "January 15, 2024".
+    
+    Memoized because every summary sent on a given day renders the same
+    date, and strftime with month names is slower than a cache hit.
+    """
+    return day.strftime(fmt)
+
+
+MarketData = Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]
+
+# Index and top-mover data behind every summary, shared across service
+# instances (one is created per message). Fresh data is served as-is; stale
+# data is served while one background fetch refreshes it; anything older, or
+# from a previous day, is fetched inline by a single shared task.
+MARKET_DATA_FRESH_SECONDS = 60
+MARKET_DATA_STALE_SECONDS = 600
+_market_data: Optional[Tuple[float, date, MarketData]] = None
+_market_data_task: "Optional[asyncio.Task[MarketData]]" = None
+
 
 class MarketReportService:
     """
@@ -36,15 +61,14 @@ class MarketReportService:
         """
         self.settings = settings
         self.api_base_url = settings.ALPHABOARD_API_BASE_URL.rstrip("/")
-        
-        self._http_client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={"Content-Type": "application/json"}
-        )
     
     async def close(self):
-        """Close HTTP client."""
-        await self._http_client.aclose()
+        """
+        Nothing to release. Requests go through the shared HTTP client.
+        
+        The client is looked up per request rather than held, so a shared
+        background refresh started by this instance outlives its close().
+        """
     
     async def build_daily_summary(
         self,
@@ -60,11 +84,7 @@ class MarketReportService:
             Formatted summary text for WhatsApp
         """
         try:
-            # Fetch index data
-            indices_data = await self._fetch_indices_data()
-            
-            # Fetch top movers
-            top_movers = await self._fetch_top_movers()
+            indices_data, top_movers = await self._get_market_data()
             
             # Build summary
             summary = self._format_summary(indices_data, top_movers, tickers)
@@ -75,33 +95,98 @@ class MarketReportService:
             logger.error(f"Error building daily summary: {e}")
             return self._get_fallback_summary()
     
+    async def _get_market_data(self) -> MarketData:
+        """
+        Get index and top-mover data, from cache when recent enough.
+        
+        Returns:
+            Tuple of (indices data, top movers)
+        """
+        cached = _market_data
+        if cached is not None and cached[1] == date.today():
+            age = time.monotonic() - cached[0]
+            if age < MARKET_DATA_STALE_SECONDS:
+                if age >= MARKET_DATA_FRESH_SECONDS:
+                    self._refresh_market_data()
+                return cached[2]
+        
+        # Shielded so one caller giving up does not cancel the shared fetch
+        return await asyncio.shield(self._refresh_market_data())
+    
+    def _refresh_market_data(self) -> "asyncio.Task[MarketData]":
+        """Start a market data fetch, or return the one already in flight."""
+        global _market_data_task
+        if _market_data_task is None or _market_data_task.done():
+            _market_data_task = asyncio.create_task(self._fetch_market_data())
+        return _market_data_task
+    
+    async def _fetch_market_data(self) -> MarketData:
+        """
+        Fetch index and top-mover data and cache it.
+        
+        Nothing is cached when every index fetch failed, so the next
+        summary retries instead of serving "Data unavailable".
+        
+        Returns:
+            Tuple of (indices data, top movers)
+        """
+        global _market_data
+        indices_data, top_movers = await asyncio.gather(
+            self._fetch_indices_data(),
+            self._fetch_top_movers()
+        )
+        
+        if indices_data:
+            _market_data = (time.monotonic(), date.today(), (indices_data, top_movers))
+        
+        return indices_data, top_movers
+    
     async def _fetch_indices_data(self) -> Dict[str, Dict[str, Any]]:
         """
         Fetch data for major indices.
         
+        The indices are fetched concurrently; ones that fail are left out.
+        
         Returns:
-            Dict mapping ticker to index data
+            Dict mapping ticker to index data, in INDICES order
         """
-        indices_data = {}
-        
-        for ticker, name in self.INDICES.items():
-            try:
-                url = f"{self.api_base_url}/market/summary/{ticker}"
-                response = await self._http_client.get(url)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    indices_data[ticker] = {
-                        "name": name,
-                        "price": data.get("regularMarketPrice", 0),
-                        "change": data.get("regularMarketChange", 0),
-                        "change_pct": data.get("regularMarketChangePercent", 0)
-                    }
-            except Exception as e:
-                logger.warning(f"Error fetching {ticker}: {e}")
-                continue
+        results = await asyncio.gather(
+            *(self._fetch_index(ticker, name) for ticker, name in self.INDICES.items())
+        )
         
-        return indices_data
+        return {
+            ticker: data
+            for ticker, data in zip(self.INDICES, results)
+            if data is not None
+        }
+    
+    async def _fetch_index(self, ticker: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch data for one index.
+        
+        Args:
+            ticker: Index ticker
+            name: Display name
+            
+        Returns:
+            Index data, or None if unavailable
+        """
+        try:
+            url = f"{self.api_base_url}/market/summary/{ticker}"
+            response = await get_http_client().get(url, timeout=30.0)
+            
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "name": name,
+                    "price": data.get("regularMarketPrice", 0),
+                    "change": data.get("regularMarketChange", 0),
+                    "change_pct": data.get("regularMarketChangePercent", 0)
+                }
+        except Exception as e:
+            logger.warning(f"Error fetching {ticker}: {e}")
+        
+        return None
     
     async def _fetch_top_movers(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -142,7 +227,7 @@ class MarketReportService:
         Returns:
             Formatted message string
         """
-        today = date.today().strftime("%B %d, %Y")
+        today = format_report_date(date.today())
         
         lines = [
             f"📈 *Market Close Summary*",
@@ -152,15 +237,11 @@ class MarketReportService:
         # Format indices
         if indices:
             lines.append("*Major Indices:*")
-            for ticker, data in indices.items():
-                name = data["name"]
-                price = data["price"]
-                change_pct = data["change_pct"]
-                
-                emoji = "🟢" if change_pct >= 0 else "🔴"
-                sign = "+" if change_pct >= 0 else ""
-                
-                lines.append(f"{emoji} {name}: {price:,.0f} ({sign}{change_pct:.1f}%)")
+            lines.extend(
+                f"{'🟢' if data['change_pct'] >= 0 else '🔴'} {data['name']}: "
+                f"{data['price']:,.0f} ({data['change_pct']:+.1f}%)"
+                for data in indices.values()
+            )
             lines.append("")
         else:
             # Fallback for when API is unavailable
@@ -220,9 +301,8 @@ class MarketReportService:
         if not indices:
             return "Market data being updated."
         
-        # Calculate overall market sentiment
-        changes = [d.get("change_pct", 0) for d in indices.values()]
-        avg_change = sum(changes) / len(changes) if changes else 0
+        # Calculate overall market sentiment (indices is non-empty here)
+        avg_change = sum(d.get("change_pct", 0) for d in indices.values()) / len(indices)
         
         if avg_change > 1:
             return "Strong bullish momentum across indices. IT and financials leading the rally."
@@ -240,7 +320,7 @@ class MarketReportService:
         Returns:
             Fallback message string
         """
-        today = date.today().strftime("%B %d, %Y")
+        today = format_report_date(date.today())
         
         return f"""📈 *Market Close Summary*
 _{today}_
@@ -280,24 +360,39 @@ _Reply `menu` for more options_"""
         # Add watchlist performance
         watchlist_lines = ["\n📋 *Your Watchlist:*"]
         
-        for item in watchlist[:5]:
-            ticker = item["ticker"]
-            try:
-                url = f"{self.api_base_url}/market/price/{ticker}"
-                response = await self._http_client.get(url)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    price = data.get("price", 0)
-                    watchlist_lines.append(f"• {ticker}: ₹{price:,.2f}")
-            except:
-                watchlist_lines.append(f"• {ticker}: --")
+        price_lines = await asyncio.gather(
+            *(self._fetch_watchlist_line(item["ticker"]) for item in watchlist[:5])
+        )
+        watchlist_lines.extend(line for line in price_lines if line is not None)
         
         if len(watchlist) > 5:
             watchlist_lines.append(f"_...and {len(watchlist) - 5} more_")
         
         return base_summary + "\n".join(watchlist_lines)
     
+    async def _fetch_watchlist_line(self, ticker: str) -> Optional[str]:
+        """
+        Fetch the current price line for one watchlist ticker.
+        
+        Args:
+            ticker: Stock ticker
+            
+        Returns:
+            Formatted line, "--" on error, or None if the API had no price
+        """
+        try:
+            url = f"{self.api_base_url}/market/price/{ticker}"
+            response = await get_http_client().get(url, timeout=30.0)
+            
+            if response.status_code == 200:
+                data = response.json()
+                price = data.get("price", 0)
+                return f"• {ticker}: ₹{price:,.2f}"
+        except Exception:
+            return f"• {ticker}: --"
+        
+        return None
+    
     def get_template_components(
         self,
         summary: str
@@ -311,7 +406,7 @@ _Reply `menu` for more options_"""
         Returns:
             List of template components for WhatsApp API
         """
-        today = date.today().strftime("%B %d")
+        today = format_report_date(date.today(), "%B %d")
         
         # Extract key metrics for template variables
         # This assumes a simple template with date and headline
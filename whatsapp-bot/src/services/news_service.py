@@ -3,19 +3,38 @@ News service for fetching stock news from multiple sources.
 Provides fallback to free APIs when AlphaBoard API returns limited results.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
+import re
+from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from ..config import CREDIBLE_NEWS_SOURCES, NEWS_SOURCE_NAMES, get_source_from_url
+from ..http_client import get_http_client
+from ..lookup_cache import InMemoryLookupCache
 
 logger = logging.getLogger(__name__)
 
 # Free tier API endpoints
 FINNHUB_API_BASE = "https://finnhub.io/api/v1"
 FINNHUB_NEWS_ENDPOINT = "/company-news"
+NEWS_REQUEST_TIMEOUT_SECONDS = 30.0
+
+# Finnhub articles by (ticker, day), so repeated lookups of a ticker stay off
+# the free tier's 60 calls/min quota. Concurrent misses share one request.
+FINNHUB_CACHE_TTL_SECONDS = 900
+_finnhub_news_cache = InMemoryLookupCache(FINNHUB_CACHE_TTL_SECONDS, max_size=1024)
+_finnhub_news_pending: Dict[str, "asyncio.Task[List[Dict[str, Any]]]"] = {}
+
+# Punctuation and whitespace runs, collapsed when comparing headlines so the
+# same story from AlphaBoard and Finnhub is only listed once
+HEADLINE_NOISE_PATTERN = re.compile(r"[^a-z0-9]+")
+HEADLINE_KEY_LENGTH = 80
+
+
+def headline_key(headline: str) -> str:
+    """Normalize a headline for duplicate detection."""
+    return HEADLINE_NOISE_PATTERN.sub(" ", headline.lower()).strip()[:HEADLINE_KEY_LENGTH]
 
 
 class NewsService:
@@ -33,18 +52,9 @@ class NewsService:
     ):
         self.alphaboard_api_url = alphaboard_api_url
         self.finnhub_api_key = finnhub_api_key
-        self._client: Optional[httpx.AsyncClient] = None
-    
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=30.0)
-        return self._client
     
     async def close(self):
-        """Close HTTP client."""
-        if self._client:
-            await self._client.aclose()
+        """Nothing to release. Requests go through the shared HTTP client."""
     
     async def get_news(
         self,
@@ -63,25 +73,26 @@ class NewsService:
         Returns:
             List of news articles with credible source info
         """
-        articles = []
-        
-        # Try AlphaBoard API first
+        # Query both sources at once; AlphaBoard articles come first so they
+        # win over Finnhub duplicates. Each fetch logs and swallows its errors.
+        fetches = []
         if self.alphaboard_api_url:
-            alphaboard_news = await self._fetch_from_alphaboard(ticker)
-            articles.extend(alphaboard_news)
+            fetches.append(self._fetch_from_alphaboard(ticker))
+        if self.finnhub_api_key:
+            fetches.append(self._fetch_from_finnhub(ticker))
         
-        # If we don't have enough credible articles, try Finnhub
-        credible_count = sum(1 for a in articles if a.get("is_credible", False))
-        if credible_count < max_articles and self.finnhub_api_key:
-            finnhub_news = await self._fetch_from_finnhub(ticker)
-            articles.extend(finnhub_news)
+        articles = [
+            article
+            for source_articles in await asyncio.gather(*fetches)
+            for article in source_articles
+        ]
         
         # Filter and deduplicate
         seen_headlines = set()
         filtered_articles = []
         
         for article in articles:
-            headline = article.get("headline", "").lower()[:50]
+            headline = headline_key(article.get("headline", ""))
             if headline in seen_headlines:
                 continue
             seen_headlines.add(headline)
@@ -109,10 +120,11 @@ class NewsService:
     async def _fetch_from_alphaboard(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch news from AlphaBoard API."""
         try:
-            client = await self._get_client()
             url = f"{self.alphaboard_api_url}/news/{ticker}"
             
-            response = await client.get(url)
+            # Looked up per call: this service is a singleton and the shared
+            # client is recreated when a job closes it at the end of its loop
+            response = await get_http_client().get(url, timeout=NEWS_REQUEST_TIMEOUT_SECONDS)
             if response.status_code != 200:
                 logger.warning(f"AlphaBoard news API error: {response.status_code}")
                 return []
@@ -146,25 +158,47 @@ class NewsService:
         if not self.finnhub_api_key:
             return []
         
+        # Finnhub expects US tickers without suffix
+        clean_ticker = ticker.replace(".NS", "").replace(".BO", "")
+        to_date = date.today()
+        cache_key = f"{clean_ticker}:{to_date.isoformat()}"
+        
+        cached = await _finnhub_news_cache.get(cache_key)
+        if cached is not None:
+            articles = cached["articles"]
+        else:
+            pending = _finnhub_news_pending.get(cache_key)
+            if pending is None:
+                pending = asyncio.ensure_future(self._request_finnhub_news(clean_ticker, to_date, cache_key))
+                _finnhub_news_pending[cache_key] = pending
+                pending.add_done_callback(lambda _: _finnhub_news_pending.pop(cache_key, None))
+            articles = await asyncio.shield(pending)
+        
+        # get_news annotates the articles it returns, so hand out copies
+        return [dict(article) for article in articles]
+    
+    async def _request_finnhub_news(
+        self,
+        clean_ticker: str,
+        to_date: date,
+        cache_key: str
+    ) -> List[Dict[str, Any]]:
+        """Request the last 7 days of Finnhub news and cache non-empty results."""
         try:
-            client = await self._get_client()
-            
-            # Finnhub expects US tickers without suffix
-            clean_ticker = ticker.replace(".NS", "").replace(".BO", "")
-            
             # Get news from last 7 days
-            to_date = datetime.now()
             from_date = to_date - timedelta(days=7)
             
             url = f"{FINNHUB_API_BASE}{FINNHUB_NEWS_ENDPOINT}"
             params = {
                 "symbol": clean_ticker,
-                "from": from_date.strftime("%Y-%m-%d"),
-                "to": to_date.strftime("%Y-%m-%d"),
+                "from": from_date.isoformat(),
+                "to": to_date.isoformat(),
                 "token": self.finnhub_api_key
             }
             
-            response = await client.get(url, params=params)
+            response = await get_http_client().get(
+                url, params=params, timeout=NEWS_REQUEST_TIMEOUT_SECONDS
+            )
             if response.status_code != 200:
                 logger.warning(f"Finnhub API error: {response.status_code}")
                 return []
@@ -186,6 +220,9 @@ class NewsService:
                     "origin": "finnhub"
                 })
             
+            # Empty results are not cached, since errors also return []
+            if articles:
+                await _finnhub_news_cache.set(cache_key, {"articles": articles})
             return articles
             
         except Exception as e:
@@ -5,15 +5,62 @@ Sends daily market close reports to subscribed WhatsApp users.
 
 import logging
 import asyncio
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Callable, Awaitable
 
 from ..config import Settings
 from ..whatsapp_client import WhatsAppClient
 from ..alphaboard_client import AlphaBoardClient
+from ..http_client import close_http_client
+from ..redis_client import close_redis_client
 from ..services.market_reports import MarketReportService
 
 logger = logging.getLogger(__name__)
 
+# Broadcast pacing: up to BROADCAST_CONCURRENCY sends in flight, started no
+# faster than BROADCAST_RATE_PER_SECOND (well under the Cloud API's default
+# per-number throughput, so a broadcast is not throttled)
+BROADCAST_CONCURRENCY = 20
+BROADCAST_RATE_PER_SECOND = 20
+
+
+class _SendPacer:
+    """Spaces send starts evenly, at most `rate` per second."""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+    
+    async def wait(self) -> None:
+        """Wait for this caller's slot. Slots are claimed in call order."""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def _send_to_all(
+    users: List[Dict[str, Any]],
+    send_one: Callable[[Dict[str, Any]], Awaitable[None]]
+) -> None:
+    """
+    Run send_one for every user with bounded concurrency and a paced start rate.
+    
+    Args:
+        users: User rows to send to
+        send_one: Per-user send; must handle (and record) its own errors
+    """
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    pacer = _SendPacer(BROADCAST_RATE_PER_SECOND)
+    
+    async def _paced_send(user: Dict[str, Any]) -> None:
+        async with semaphore:
+            await pacer.wait()
+            await send_one(user)
+    
+    await asyncio.gather(*(_paced_send(user) for user in users))
+
 
 async def send_daily_close_to_all_subscribed(settings: Settings) -> Dict[str, Any]:
     """
@@ -61,22 +108,25 @@ async def send_daily_close_to_all_subscribed(settings: Settings) -> Dict[str, An
         # Build base summary once
         base_summary = await market_service.build_daily_summary()
         
-        # Send to each subscriber
-        for user in subscribers:
+        # Plain-text reports are personalized; fetch every watchlist in one go
+        # rather than one query per subscriber
+        watchlists_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        if not settings.WHATSAPP_DAILY_TEMPLATE_NAME:
+            watchlists_by_user = await ab_client.list_watchlists_bulk(
+                [user["id"] for user in subscribers if user.get("id")]
+            )
+        
+        async def _send_daily_close(user: Dict[str, Any]) -> None:
             phone = user.get("phone", "")
             user_id = user.get("id", "")
             
             if not phone:
                 logger.warning(f"Skipping user {user_id}: no phone number")
-                continue
+                return
             
             try:
                 # Try to send using template (required for proactive messages)
                 if settings.WHATSAPP_DAILY_TEMPLATE_NAME:
-                    # Get user's watchlist for personalization
-                    watchlist = await ab_client.list_watchlist(user_id)
-                    tickers = [item["ticker"] for item in watchlist[:3]]
-                    
                     # Build template components
                     components = market_service.get_template_components(base_summary)
                     
@@ -89,7 +139,7 @@ async def send_daily_close_to_all_subscribed(settings: Settings) -> Dict[str, An
                 else:
                     # Fallback: Send as regular message (only works within 24h window)
                     # Get personalized summary if user has watchlist
-                    watchlist = await ab_client.list_watchlist(user_id)
+                    watchlist = watchlists_by_user.get(user_id, [])
                     
                     if watchlist:
                         summary = await market_service.build_personalized_summary(
@@ -103,9 +153,6 @@ async def send_daily_close_to_all_subscribed(settings: Settings) -> Dict[str, An
                 results["sent_success"] += 1
                 logger.debug(f"Sent daily close to {phone[:6]}***")
                 
-                # Rate limiting: wait between messages to avoid throttling
-                await asyncio.sleep(0.5)
-                
             except Exception as user_error:
                 logger.error(f"Failed to send to {phone[:6]}***: {user_error}")
                 results["sent_failed"] += 1
@@ -114,6 +161,9 @@ async def send_daily_close_to_all_subscribed(settings: Settings) -> Dict[str, An
                     "error": str(user_error)
                 })
         
+        # Send to each subscriber (paced to avoid throttling)
+        await _send_to_all(subscribers, _send_daily_close)
+        
         logger.info(
             f"Daily close broadcast complete: "
             f"{results['sent_success']} sent, {results['sent_failed']} failed"
@@ -186,19 +236,16 @@ async def broadcast_to_users(
         
         logger.info(f"Broadcasting to {len(users)} users")
         
-        for user in users:
+        async def _send_message(user: Dict[str, Any]) -> None:
             phone = user.get("phone", "")
             
             if not phone:
-                continue
+                return
             
             try:
                 await wa_client.send_text_message(to=phone, body=message)
                 results["sent_success"] += 1
                 
-                # Rate limiting
-                await asyncio.sleep(0.5)
-                
             except Exception as user_error:
                 logger.error(f"Failed to send to {phone[:6]}***: {user_error}")
                 results["sent_failed"] += 1
@@ -207,6 +254,9 @@ async def broadcast_to_users(
                     "error": str(user_error)
                 })
         
+        # Send to each user (paced to avoid throttling)
+        await _send_to_all(users, _send_message)
+        
         logger.info(
             f"Broadcast complete: "
             f"{results['sent_success']} sent, {results['sent_failed']} failed"
@@ -237,7 +287,15 @@ def run_daily_close_sync(settings: Settings) -> Dict[str, Any]:
     Returns:
         Summary dict
     """
-    return asyncio.run(send_daily_close_to_all_subscribed(settings))
+    async def _run() -> Dict[str, Any]:
+        try:
+            return await send_daily_close_to_all_subscribed(settings)
+        finally:
+            # The shared HTTP and Redis connections are bound to this event loop
+            await close_http_client()
+            await close_redis_client()
+    
+    return asyncio.run(_run())
 
 
 # Entry point for external schedulers
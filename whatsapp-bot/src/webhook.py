@@ -69,22 +69,22 @@ async def handle_webhook(
         WebhookResponse with status "EVENT_RECEIVED"
     """
     try:
-        # Parse raw JSON body
-        body = await request.json()
-        logger.debug(f"Webhook payload: {body}")
+        # Decode and validate the raw body in one pass (pydantic-core parses the
+        # JSON itself, without building an intermediate dict)
+        raw_body = await request.body()
+        logger.debug("Webhook payload: %s", raw_body)
         
-        # Validate basic structure
-        if body.get("object") != "whatsapp_business_account":
-            logger.debug("Ignoring non-WhatsApp webhook")
-            return WebhookResponse()
-        
-        # Parse the payload
         try:
-            payload = WhatsAppWebhookPayload(**body)
+            payload = WhatsAppWebhookPayload.model_validate_json(raw_body)
         except Exception as parse_error:
             logger.error(f"Failed to parse webhook payload: {parse_error}")
             return WebhookResponse()
         
+        # Validate basic structure
+        if payload.object != "whatsapp_business_account":
+            logger.debug("Ignoring non-WhatsApp webhook")
+            return WebhookResponse()
+        
         # Process each entry and change
         for entry in payload.entry:
             for change in entry.changes:
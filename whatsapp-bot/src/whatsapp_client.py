@@ -8,6 +8,7 @@ from typing import Optional, List, Dict, Any
 import httpx
 
 from .config import Settings
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -30,17 +31,13 @@ class WhatsAppClient:
         self.phone_number_id = settings.META_WHATSAPP_PHONE_NUMBER_ID
         self.base_url = f"https://graph.facebook.com/{self.api_version}/{self.phone_number_id}/messages"
         
-        self._client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json"
-            }
-        )
+        self._auth_headers = {"Authorization": f"Bearer {self.access_token}"}
+        self._headers = {**self._auth_headers, "Content-Type": "application/json"}
+        self._client = get_http_client()
     
     async def close(self):
-        """Close the HTTP client."""
-        await self._client.aclose()
+        """Release the client. The shared HTTP client stays open for reuse."""
+        self._client = None
     
     async def _send_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -53,7 +50,9 @@ class WhatsAppClient:
             API response as dict
         """
         try:
-            response = await self._client.post(self.base_url, json=payload)
+            response = await self._client.post(
+                self.base_url, json=payload, headers=self._headers, timeout=30.0
+            )
             
             if response.status_code != 200:
                 logger.error(
@@ -169,32 +168,22 @@ class WhatsAppClient:
         logger.info(f"Sending audio from URL to {to[:6]}***")
         return await self._send_request(payload)
     
-    async def upload_and_send_audio(
-        self,
-        to: str,
-        audio_bytes: bytes,
-        filename: str = "podcast.mp3",
-        caption: Optional[str] = None
-    ) -> Dict[str, Any]:
+    async def upload_audio(self, audio_bytes: bytes, filename: str = "podcast.mp3") -> Dict[str, Any]:
         """
-        Upload audio bytes and send to WhatsApp user.
-        Uses WhatsApp Media API to upload first, then send.
+        Upload audio bytes to the WhatsApp Media API.
         
         Based on: https://developers.facebook.com/docs/whatsapp/cloud-api/reference/media
         
         Args:
-            to: Recipient phone number in E.164 format
             audio_bytes: Audio file bytes (MP3)
             filename: Filename for the upload
-            caption: Optional caption
             
         Returns:
-            API response
+            Upload response with the media "id", or an error dict
         """
         try:
-            logger.info(f"Uploading audio ({len(audio_bytes)} bytes) for {to[:6]}***")
+            logger.info(f"Uploading audio ({len(audio_bytes)} bytes)")
             
-            # Step 1: Upload media to WhatsApp Cloud API
             upload_url = f"https://graph.facebook.com/{self.api_version}/{self.phone_number_id}/media"
             
             # Per WhatsApp docs: multipart/form-data with file, type, messaging_product
@@ -208,15 +197,14 @@ class WhatsAppClient:
                 'file': (filename, audio_bytes, 'audio/mpeg')
             }
             
-            # Create a fresh client for upload to avoid content-type conflicts
-            import httpx
-            async with httpx.AsyncClient(timeout=120.0) as upload_client:
-                upload_response = await upload_client.post(
-                    upload_url,
-                    data=data,
-                    files=files,
-                    headers={"Authorization": f"Bearer {self.access_token}"}
-                )
+            # Only the auth header here; httpx sets the multipart content type
+            upload_response = await self._client.post(
+                upload_url,
+                data=data,
+                files=files,
+                headers=self._auth_headers,
+                timeout=120.0
+            )
             
             logger.info(f"Upload response: {upload_response.status_code}")
             
@@ -226,39 +214,75 @@ class WhatsAppClient:
                 return {"error": True, "message": f"Upload failed: {error_text}"}
             
             upload_data = upload_response.json()
-            media_id = upload_data.get("id")
             
-            if not media_id:
+            if not upload_data.get("id"):
                 logger.error(f"No media_id in upload response: {upload_data}")
                 return {"error": True, "message": "No media ID returned"}
             
-            logger.info(f"Media uploaded successfully, ID: {media_id}")
-            
-            # Step 2: Send audio message using media_id
-            payload = {
-                "messaging_product": "whatsapp",
-                "recipient_type": "individual",
-                "to": to,
-                "type": "audio",
-                "audio": {
-                    "id": media_id
-                }
-            }
-            
-            logger.info(f"Sending audio message to {to[:6]}***")
-            result = await self._send_request(payload)
-            
-            if result.get("error"):
-                logger.error(f"Failed to send audio: {result}")
-            else:
-                logger.info(f"Audio sent successfully to {to[:6]}***")
-            
-            return result
+            logger.info(f"Media uploaded successfully, ID: {upload_data['id']}")
+            return upload_data
             
         except Exception as e:
-            logger.error(f"Error uploading and sending audio: {e}", exc_info=True)
+            logger.error(f"Error uploading audio: {e}", exc_info=True)
             return {"error": True, "message": str(e)}
     
+    async def send_audio_by_id(self, to: str, media_id: str) -> Dict[str, Any]:
+        """
+        Send previously uploaded audio to a WhatsApp user.
+        
+        Args:
+            to: Recipient phone number in E.164 format
+            media_id: Media ID returned by upload_audio
+            
+        Returns:
+            API response
+        """
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": to,
+            "type": "audio",
+            "audio": {
+                "id": media_id
+            }
+        }
+        
+        logger.info(f"Sending audio message to {to[:6]}***")
+        result = await self._send_request(payload)
+        
+        if result.get("error"):
+            logger.error(f"Failed to send audio: {result}")
+        else:
+            logger.info(f"Audio sent successfully to {to[:6]}***")
+        
+        return result
+    
+    async def upload_and_send_audio(
+        self,
+        to: str,
+        audio_bytes: bytes,
+        filename: str = "podcast.mp3",
+        caption: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload audio bytes and send to WhatsApp user.
+        Uses WhatsApp Media API to upload first, then send.
+        
+        Args:
+            to: Recipient phone number in E.164 format
+            audio_bytes: Audio file bytes (MP3)
+            filename: Filename for the upload
+            caption: Optional caption
+            
+        Returns:
+            API response
+        """
+        upload_result = await self.upload_audio(audio_bytes, filename=filename)
+        if upload_result.get("error"):
+            return upload_result
+        
+        return await self.send_audio_by_id(to, upload_result["id"])
+    
     async def send_interactive_buttons(
         self,
         to: str,
@@ -599,7 +623,7 @@ class WhatsAppClient:
         """
         try:
             url = f"https://graph.facebook.com/{self.api_version}/{self.phone_number_id}"
-            response = await self._client.get(url)
+            response = await self._client.get(url, headers=self._auth_headers)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"WhatsApp health check failed: {e}")
@@ -58,6 +58,7 @@ def mock_alphaboard_client():
         "display_name": "Test User",
         "is_daily_subscriber": True
     })
+    mock.get_user_id_by_phone = AsyncMock(return_value="user_123")
     mock.add_to_watchlist = AsyncMock(return_value={
         "id": "wl_123",
         "ticker": "TCS",
@@ -184,3 +185,60 @@ def sample_interactive_payload():
         ]
     }
 
+
+
+class FakeRedis:
+    """In-memory stand-in for the `redis.asyncio` client (decode_responses=True)."""
+    
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.ttls = {}
+    
+    async def get(self, key):
+        return self.values.get(key)
+    
+    async def setex(self, key, seconds, value):
+        self.values[key] = value
+        self.ttls[key] = seconds
+    
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+    
+    async def delete(self, key):
+        self.values.pop(key, None)
+        self.hashes.pop(key, None)
+        self.ttls.pop(key, None)
+    
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+    """Queues commands like a redis.asyncio pipeline and applies them on execute()."""
+    
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+    
+    def hset(self, key, mapping):
+        # Redis stores every field as a string
+        self._commands.append(lambda: self._redis.hashes.setdefault(key, {}).update(
+            {name: str(value) for name, value in mapping.items()}
+        ))
+        return self
+    
+    def expire(self, key, seconds):
+        self._commands.append(lambda: self._redis.ttls.__setitem__(key, seconds))
+        return self
+    
+    async def execute(self):
+        for command in self._commands:
+            command()
+        self._commands = []
+
+
+@pytest.fixture
+def fake_redis():
+    """Create an in-memory fake Redis client."""
+    return FakeRedis()
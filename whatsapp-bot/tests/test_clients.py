@@ -2,12 +2,15 @@
 Tests for WhatsApp and AlphaBoard clients.
 """
 
+import asyncio
 import pytest
+from collections import OrderedDict
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
 from src.whatsapp_client import WhatsAppClient
 from src.alphaboard_client import AlphaBoardClient, AlphaBoardClientError
+from src.lookup_cache import InMemoryLookupCache, RedisLookupCache
 
 
 class TestWhatsAppClient:
@@ -135,6 +138,26 @@ class TestWhatsAppClient:
             
             assert result.get('error') is True
             assert result.get('status_code') == 400
+    
+    @pytest.mark.asyncio
+    async def test_upload_and_send_audio(self, client):
+        """Test audio is uploaded first, then sent by media ID."""
+        with patch.object(client._client, 'post', new_callable=AsyncMock) as mock_post:
+            upload_response = MagicMock()
+            upload_response.status_code = 200
+            upload_response.json.return_value = {"id": "media_123"}
+            send_response = MagicMock()
+            send_response.status_code = 200
+            send_response.json.return_value = {"messages": [{"id": "msg_123"}]}
+            mock_post.side_effect = [upload_response, send_response]
+            
+            await client.upload_and_send_audio("919876543210", b"\x00" * 2000, filename="TCS_podcast.mp3")
+            
+            assert mock_post.call_count == 2
+            assert mock_post.call_args_list[0][1]['files']['file'][0] == "TCS_podcast.mp3"
+            payload = mock_post.call_args_list[1][1]['json']
+            assert payload['type'] == 'audio'
+            assert payload['audio']['id'] == 'media_123'
 
 
 class TestAlphaBoardClient:
@@ -143,7 +166,8 @@ class TestAlphaBoardClient:
     @pytest.fixture
     def client(self, test_settings):
         """Create AlphaBoard client with mocked Supabase."""
-        with patch('src.alphaboard_client.create_client') as mock_create:
+        with patch('src.alphaboard_client._supabase_clients', {}), \
+             patch('src.alphaboard_client.create_client') as mock_create:
             mock_supabase = MagicMock()
             mock_create.return_value = mock_supabase
             client = AlphaBoardClient(test_settings)
@@ -213,6 +237,27 @@ class TestAlphaBoardClient:
         assert len(items) == 2
         assert items[0]["ticker"] == "TCS"
     
+    @pytest.mark.asyncio
+    async def test_list_watchlists_bulk(self, client):
+        """Test bulk watchlist fetch groups items by user."""
+        mock_result = MagicMock()
+        mock_result.data = [
+            {"whatsapp_user_id": "user_1", "ticker": "TCS"},
+            {"whatsapp_user_id": "user_2", "ticker": "INFY"},
+            {"whatsapp_user_id": "user_1", "ticker": "WIPRO"}
+        ]
+        
+        client.supabase = MagicMock()
+        query = client.supabase.table.return_value.select.return_value.in_.return_value.order.return_value
+        query.execute.return_value = mock_result
+        
+        watchlists = await client.list_watchlists_bulk(["user_1", "user_2", "user_3"])
+        
+        client.supabase.table.assert_called_once_with("whatsapp_watchlist")
+        assert [item["ticker"] for item in watchlists["user_1"]] == ["TCS", "WIPRO"]
+        assert len(watchlists["user_2"]) == 1
+        assert "user_3" not in watchlists
+    
     @pytest.mark.asyncio
     async def test_add_recommendation(self, client):
         """Test adding recommendation."""
@@ -239,3 +284,202 @@ class TestAlphaBoardClient:
         with pytest.raises(AlphaBoardClientError):
             await client.get_or_create_user_by_phone("919876543210")
 
+    
+    @pytest.mark.asyncio
+    async def test_analyst_recommendations_only_count(self, client):
+        """Test only_count returns the row count without fetching rows."""
+        client.supabase = MagicMock()
+        mock_result = MagicMock()
+        mock_result.count = 7
+        
+        query = client.supabase.table.return_value.select.return_value.eq.return_value.eq.return_value
+        query.limit.return_value.execute.return_value = mock_result
+        
+        count = await client.get_analyst_recommendations_detailed("analyst_uuid", "OPEN", only_count=True)
+        
+        assert count == 7
+        client.supabase.table.return_value.select.assert_called_once_with("id", count="exact")
+        query.limit.assert_called_once_with(0)
+    
+    @pytest.mark.asyncio
+    async def test_prefetch_analyst_bundle_reused(self, client):
+        """Test prefetched analyst data is consumed instead of re-queried."""
+        with patch.object(client, '_fetch_analyst_performance', return_value={"win_rate": 60}) as mock_perf, \
+             patch.object(client, '_fetch_analyst_recommendations_detailed', new_callable=AsyncMock) as mock_recs:
+            mock_recs.return_value = [{"ticker": "TCS"}]
+            
+            await client.prefetch_analyst_bundle("analyst_uuid")
+            recs = await client.get_analyst_recommendations_detailed("analyst_uuid", "OPEN")
+            performance = await client.get_analyst_performance("analyst_uuid")
+            
+            assert recs == [{"ticker": "TCS"}]
+            assert performance == {"win_rate": 60}
+            mock_recs.assert_called_once()
+            mock_perf.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_analyst_performance_without_prefetch_off_loop(self, client):
+        """Test an un-prefetched performance lookup runs in a worker thread."""
+        with patch.object(client, '_fetch_analyst_performance', return_value={"win_rate": 55}), \
+             patch('src.alphaboard_client.asyncio.to_thread', new_callable=AsyncMock) as mock_to_thread:
+            mock_to_thread.return_value = {"win_rate": 55}
+            
+            performance = await client.get_analyst_performance("analyst_uuid")
+            
+            assert performance == {"win_rate": 55}
+            mock_to_thread.assert_awaited_once_with(client._fetch_analyst_performance, "analyst_uuid")
+    
+    @pytest.mark.asyncio
+    async def test_prefetch_analyst_bundle_matches_status(self, client):
+        """Test a prefetch is only reused for the status it was started with."""
+        with patch.object(client, '_fetch_analyst_performance', return_value={}), \
+             patch.object(client, '_fetch_analyst_recommendations_detailed', new_callable=AsyncMock) as mock_recs:
+            mock_recs.return_value = [{"ticker": "TCS", "status": "CLOSED"}]
+            
+            await client.prefetch_analyst_bundle("analyst_uuid", None)
+            await client.get_analyst_recommendations_detailed("analyst_uuid", "OPEN")
+            await client.get_analyst_recommendations_detailed("analyst_uuid", None)
+            
+            assert mock_recs.call_count == 2
+            assert [c.args[1] for c in mock_recs.call_args_list] == [None, "OPEN"]
+    
+    @pytest.mark.asyncio
+    async def test_analyst_recommendations_query_off_loop(self, client):
+        """Test the recommendations query goes through _execute alongside the profile check."""
+        client.supabase = MagicMock()
+        mock_result = MagicMock()
+        mock_result.data = [{"ticker": "TCS", "status": "OPEN", "entry_price": 100.0, "current_price": 110.0}]
+        mock_result.error = None
+        
+        with patch.object(client, 'get_profile', new_callable=AsyncMock) as mock_profile, \
+             patch.object(client, '_execute', new_callable=AsyncMock) as mock_execute:
+            mock_profile.return_value = {"id": "analyst_uuid", "username": "analyst"}
+            mock_execute.return_value = mock_result
+            
+            recs = await client.get_analyst_recommendations_detailed("analyst_uuid", "OPEN")
+            
+            assert recs[0]["ticker"] == "TCS"
+            assert recs[0]["return_pct"] == pytest.approx(10.0)
+            mock_profile.assert_awaited_once()
+            mock_execute.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_user_id_by_phone_cached(self, client):
+        """Test phone to user ID lookups are served from cache after the first call."""
+        with patch('src.alphaboard_client._user_id_cache', OrderedDict()), \
+             patch.object(client, 'get_or_create_user_by_phone', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"id": "user_123"}
+            
+            first = await client.get_user_id_by_phone("+919876543210")
+            second = await client.get_user_id_by_phone("919876543210")
+            
+            assert first == second == "user_123"
+            mock_get.assert_called_once_with("919876543210")
+    
+    @pytest.mark.asyncio
+    async def test_user_id_by_phone_coalesces_concurrent_lookups(self, client):
+        """Test concurrent first lookups for one phone share a single query."""
+        with patch('src.alphaboard_client._user_id_cache', OrderedDict()), \
+             patch.object(client, 'get_or_create_user_by_phone', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"id": "user_123"}
+            
+            results = await asyncio.gather(
+                client.get_user_id_by_phone("919876543210"),
+                client.get_user_id_by_phone("919876543210"),
+            )
+            
+            assert results == ["user_123", "user_123"]
+            mock_get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_account_status_cached_until_unlink(self, client):
+        """Test account status is cached and evicted when the user unlinks."""
+        with patch('src.alphaboard_client._account_status_cache', InMemoryLookupCache(60)), \
+             patch('src.alphaboard_client._admin_status_cache', InMemoryLookupCache(300)), \
+             patch.object(client, '_fetch_user_account_status', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = {"is_linked": True, "supabase_user_id": "clerk_123"}
+            
+            await client.get_user_account_status("user_123")
+            status = await client.get_user_account_status("user_123")
+            assert status["is_linked"] is True
+            mock_fetch.assert_called_once()
+            
+            await client.unlink_supabase_user("user_123")
+            await client.get_user_account_status("user_123")
+            assert mock_fetch.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_account_status_cached_in_redis(self, client, fake_redis):
+        """Test the Redis lookup cache stores JSON with a TTL and is evicted on unlink."""
+        with patch('src.alphaboard_client._account_status_cache', RedisLookupCache(fake_redis, "acct:", 60)), \
+             patch('src.alphaboard_client._admin_status_cache', RedisLookupCache(fake_redis, "admin:", 300)), \
+             patch.object(client, '_fetch_user_account_status', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = {"is_linked": True, "supabase_user_id": "clerk_123"}
+            
+            await client.get_user_account_status("user_123")
+            status = await client.get_user_account_status("user_123")
+            
+            assert status == {"is_linked": True, "supabase_user_id": "clerk_123"}
+            assert fake_redis.ttls["acct:user_123"] == 60
+            mock_fetch.assert_called_once()
+            
+            await client.unlink_supabase_user("user_123")
+            
+            assert "acct:user_123" not in fake_redis.values
+    
+    @pytest.mark.asyncio
+    async def test_admin_status_failure_not_cached(self, client):
+        """Test a failed admin check is returned but not cached."""
+        with patch('src.alphaboard_client._admin_status_cache', InMemoryLookupCache(300)), \
+             patch.object(client, '_fetch_admin_status', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = [Exception("DB error"), {"is_admin": True, "organization_id": "org_1"}]
+            
+            failed = await client.check_user_is_admin("user_123")
+            first = await client.check_user_is_admin("user_123")
+            second = await client.check_user_is_admin("user_123")
+            
+            assert failed["is_admin"] is False
+            assert first == second == {"is_admin": True, "organization_id": "org_1"}
+            assert mock_fetch.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_team_members_cached(self, client):
+        """Test team rosters are served from cache, but empty results are not cached."""
+        with patch('src.alphaboard_client._roster_cache', InMemoryLookupCache(300)), \
+             patch.object(client, '_fetch_team_members', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = [[], [{"user_id": "u1"}]]
+            
+            assert await client.get_team_members("team_1") == []
+            assert await client.get_team_members("team_1") == [{"user_id": "u1"}]
+            assert await client.get_team_members("team_1") == [{"user_id": "u1"}]
+            assert mock_fetch.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_roster_queries_off_loop(self, client):
+        """Test the roster fetchers run their queries through _execute."""
+        client.supabase = MagicMock()
+        teams = MagicMock(data=[{"id": "team_1", "name": "Tech"}])
+        memberships = MagicMock(data=[{"user_id": "u1", "role": "admin"}])
+        profiles = MagicMock(data=[{"id": "u1", "username": "ana", "full_name": "Ana", "role": "analyst"}])
+        
+        with patch('src.alphaboard_client._roster_cache', InMemoryLookupCache(300)), \
+             patch.object(client, '_execute', new_callable=AsyncMock) as mock_execute:
+            mock_execute.side_effect = [teams, memberships, profiles, memberships, profiles]
+            
+            assert await client.get_organization_teams("org_1") == teams.data
+            team_members = await client.get_team_members("team_1")
+            org_members = await client.get_organization_members("org_1")
+            
+            assert team_members[0]["user_id"] == "u1"
+            assert org_members[0]["role"] == "admin"
+            assert mock_execute.await_count == 5
+    
+    def test_supabase_client_shared_across_instances(self, test_settings):
+        """Test per-message clients reuse one Supabase client."""
+        with patch('src.alphaboard_client._supabase_clients', {}), \
+             patch('src.alphaboard_client.create_client') as mock_create:
+            first = AlphaBoardClient(test_settings)
+            second = AlphaBoardClient(test_settings)
+            
+            mock_create.assert_called_once()
+            assert second.supabase is first.supabase
@@ -0,0 +1,59 @@
+"""
+Tests for conversation state management.
+"""
+
+import time
+import pytest
+
+from src.conversation_state import (
+    ConversationContext,
+    ConversationFlow,
+    ConversationStateManager,
+    RedisConversationStore,
+)
+
+
+class TestRedisConversationStore:
+    """Tests for RedisConversationStore class."""
+    
+    @pytest.mark.asyncio
+    async def test_context_round_trip(self, fake_redis):
+        """Test a stored context reads back with flow, step, data and age intact."""
+        store = RedisConversationStore(fake_redis, ttl_seconds=1800)
+        context = ConversationContext(
+            flow=ConversationFlow.ADD_RECOMMENDATION,
+            step=2,
+            data={"action": "BUY", "ticker": "TCS", "price": 3500.5},
+            created_at=time.monotonic() - 120
+        )
+        
+        await store.set("user_123", context)
+        loaded = await store.get("user_123")
+        
+        assert fake_redis.ttls["conv:user_123"] == 1800
+        assert loaded.flow is ConversationFlow.ADD_RECOMMENDATION
+        assert loaded.step == 2
+        assert loaded.data == {"action": "BUY", "ticker": "TCS", "price": 3500.5}
+        assert loaded.created_at == pytest.approx(context.created_at, abs=1.0)
+        
+        await store.delete("user_123")
+        
+        assert await store.get("user_123") is None
+    
+    @pytest.mark.asyncio
+    async def test_manager_flow_through_redis(self, fake_redis):
+        """Test a full flow driven by the state manager over the Redis store."""
+        manager = ConversationStateManager(RedisConversationStore(fake_redis))
+        
+        await manager.start_flow("user_123", ConversationFlow.ADD_WATCHLIST)
+        await manager.advance_step("user_123", {"ticker": "INFY"})
+        
+        assert await manager.is_in_flow("user_123")
+        context = await manager.get_context("user_123")
+        assert context.step == 2
+        
+        data = await manager.complete_flow("user_123")
+        
+        assert data == {"ticker": "INFY"}
+        assert not await manager.is_in_flow("user_123")
+        assert "conv:user_123" not in fake_redis.hashes
@@ -0,0 +1,102 @@
+"""
+Tests for the daily close broadcast job.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+
+from src.tasks import daily_close_job
+from src.tasks.daily_close_job import _SendPacer, _send_to_all, send_daily_close_to_all_subscribed
+
+
+class TestBroadcastPacing:
+    """Tests for broadcast pacing and concurrency."""
+    
+    @pytest.mark.asyncio
+    async def test_pacer_spaces_starts(self):
+        """Test each send start is delayed one interval after the previous one."""
+        real_sleep = asyncio.sleep
+        delays = []
+        
+        async def fake_sleep(delay):
+            delays.append(delay)
+            await real_sleep(0)
+        
+        # Only the job module's own time/asyncio names are replaced, so the
+        # event loop keeps its real clock
+        frozen_time = MagicMock()
+        frozen_time.monotonic.return_value = 100.0
+        pacer = _SendPacer(rate=20)
+        with patch.object(daily_close_job, 'time', frozen_time), \
+             patch.object(daily_close_job, 'asyncio', MagicMock(sleep=fake_sleep)):
+            for _ in range(4):
+                await pacer.wait()
+        
+        # The first start goes immediately; the clock is frozen, so the
+        # following ones wait 1, 2 and 3 intervals
+        assert delays == pytest.approx([0.05, 0.10, 0.15])
+    
+    @pytest.mark.asyncio
+    async def test_send_to_all_caps_concurrency(self):
+        """Test no more than BROADCAST_CONCURRENCY sends are in flight at once."""
+        in_flight = 0
+        peak = 0
+        sent = []
+        
+        async def send_one(user):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            sent.append(user["id"])
+        
+        users = [{"id": str(i)} for i in range(10)]
+        with patch.object(daily_close_job, 'BROADCAST_CONCURRENCY', 3), \
+             patch.object(daily_close_job, 'BROADCAST_RATE_PER_SECOND', 10_000):
+            await _send_to_all(users, send_one)
+        
+        assert peak == 3
+        assert sorted(sent, key=int) == [user["id"] for user in users]
+
+
+class TestDailyClose:
+    """Tests for send_daily_close_to_all_subscribed."""
+    
+    @pytest.mark.asyncio
+    async def test_counters_with_failed_sends(self, test_settings):
+        """Test success and failure counts add up when some sends fail."""
+        subscribers = [
+            {"id": "u1", "phone": "919800000001"},
+            {"id": "u2", "phone": "919800000002"},
+            {"id": "u3", "phone": ""},
+            {"id": "u4", "phone": "919800000004"},
+        ]
+        
+        async def send_template(to, **kwargs):
+            if to.endswith("2"):
+                raise Exception("rate limited")
+            return {"messages": [{"id": "msg_123"}]}
+        
+        wa_client = MagicMock()
+        wa_client.close = AsyncMock()
+        wa_client.send_template_message = AsyncMock(side_effect=send_template)
+        ab_client = MagicMock()
+        ab_client.close = AsyncMock()
+        ab_client.list_daily_subscribed_users = AsyncMock(return_value=subscribers)
+        market_service = MagicMock()
+        market_service.close = AsyncMock()
+        market_service.build_daily_summary = AsyncMock(return_value="summary")
+        
+        with patch.object(daily_close_job, 'WhatsAppClient', return_value=wa_client), \
+             patch.object(daily_close_job, 'AlphaBoardClient', return_value=ab_client), \
+             patch.object(daily_close_job, 'MarketReportService', return_value=market_service), \
+             patch.object(daily_close_job, 'BROADCAST_RATE_PER_SECOND', 10_000):
+            results = await send_daily_close_to_all_subscribed(test_settings)
+        
+        assert results["total_subscribers"] == 4
+        assert results["sent_success"] == 2
+        assert results["sent_failed"] == 1
+        assert results["errors"] == [{"phone": "919800***", "error": "rate limited"}]
+        assert wa_client.send_template_message.call_count == 3
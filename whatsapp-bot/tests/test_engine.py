@@ -6,8 +6,10 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime
 
-from src.engine import MessageEngine
+from src.engine import MessageEngine, format_inr
+from src.alphaboard_client import AlphaBoardClientError
 from src.schemas import ParsedMessage
+from src.services.templates import Templates
 
 
 class TestMessageEngine:
@@ -46,6 +48,17 @@ class TestMessageEngine:
         
         engine.wa_client.send_main_menu.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_mark_read_failure_does_not_block_reply(self, engine, make_message):
+        """Test a failed read receipt still routes the message."""
+        engine.wa_client.mark_message_read.side_effect = Exception("network down")
+        message = make_message("help")
+        
+        await engine.handle_incoming_message(message)
+        
+        engine.ab_client.get_user_id_by_phone.assert_called_once()
+        engine.wa_client.send_main_menu.assert_called_once()
+    
     @pytest.mark.asyncio
     async def test_menu_command(self, engine, make_message):
         """Test menu command sends main menu."""
@@ -100,6 +113,31 @@ class TestMessageEngine:
         engine.ab_client.list_watchlist.assert_called_once()
         engine.wa_client.send_text_message.assert_called()
     
+    @pytest.mark.asyncio
+    async def test_show_watchlist_merges_alphaboard(self, engine, make_message):
+        """Test linked watchlists merge by ticker, keeping WhatsApp order first."""
+        engine.ab_client.get_user_account_status = AsyncMock(return_value={
+            "is_linked": True,
+            "supabase_user_id": "sb_123"
+        })
+        engine.ab_client.get_alphaboard_watchlist = AsyncMock(return_value=[
+            {"ticker": "HDFC", "entry_date": "2024-02-01T00:00:00", "entry_price": 1500.0},
+            {"ticker": "TCS", "entry_date": "2024-01-15T00:00:00", "entry_price": 3400.0, "current_price": 3570.0}
+        ])
+        engine.ab_client.get_user_price_alerts = AsyncMock(return_value=[
+            {"ticker": "TCS", "alert_type": "SELL", "trigger_price": "3800"}
+        ])
+        message = make_message("my watchlist")
+        
+        await engine.handle_incoming_message(message)
+        
+        text = engine.wa_client.send_text_message.call_args[0][1]
+        assert text.index("*TCS*") < text.index("*INFY*") < text.index("*HDFC*")
+        assert "📅 2024-01-15" in text
+        assert "₹3,400 → ₹3,570 | 🟢 +5.0%" in text
+        assert "Entry: ₹1,500" in text
+        assert "🔔 above ₹3,800" in text
+    
     @pytest.mark.asyncio
     async def test_recommendation_full(self, engine, make_message):
         """Test full recommendation command."""
@@ -147,6 +185,25 @@ class TestMessageEngine:
         call_args = engine.ab_client.request_podcast.call_args
         assert "market today" in call_args[0][1]
     
+    @pytest.mark.asyncio
+    async def test_podcast_without_audio_sends_script_with_summary(self, engine, make_message):
+        """Test the script fallback goes out in the same message as the summary."""
+        engine.ab_client.generate_podcast_via_api = AsyncMock(return_value={
+            "podcastTitle": "Quick Take: TCS",
+            "keyPoints": ["Margins steady"],
+            "script": "TCS reported steady margins."
+        })
+        message = make_message("podcast TCS")
+        
+        await engine.handle_incoming_message(message)
+        
+        # "Generating" notice, then one summary-plus-script message
+        assert engine.wa_client.send_text_message.call_count == 2
+        text = engine.wa_client.send_text_message.call_args[0][1]
+        assert "Margins steady" in text
+        assert "TCS reported steady margins." in text
+        engine.wa_client.upload_audio.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_news_request(self, engine, make_message):
         """Test news request command."""
@@ -178,6 +235,68 @@ class TestMessageEngine:
         engine.ab_client.get_stock_summary.assert_called_once_with("TCS")
         engine.ab_client.get_stock_price.assert_called_once_with("TCS")
     
+    @pytest.mark.asyncio
+    async def test_unlink_account(self, engine, make_message):
+        """Test unlink command unlinks through the client."""
+        engine.ab_client.unlink_supabase_user = AsyncMock(return_value=True)
+        message = make_message("unlink")
+        
+        await engine.handle_incoming_message(message)
+        
+        engine.ab_client.unlink_supabase_user.assert_called_once_with("user_123")
+        assert engine.wa_client.send_text_message.call_args[0][1] == Templates.ACCOUNT_UNLINKED
+    
+    @pytest.mark.asyncio
+    async def test_unlink_account_not_linked(self, engine, make_message):
+        """Test unlink reports not linked when the conditional update matches nothing."""
+        engine.ab_client.unlink_supabase_user = AsyncMock(return_value=False)
+        message = make_message("unlink")
+        
+        await engine.handle_incoming_message(message)
+        
+        assert engine.wa_client.send_text_message.call_args[0][1] == Templates.ACCOUNT_NOT_LINKED
+    
+    @pytest.mark.asyncio
+    async def test_connect_account_already_linked(self, engine, make_message):
+        """Test a linked user is told so instead of getting a link code."""
+        engine.ab_client.get_user_account_status = AsyncMock(return_value={
+            "is_linked": True,
+            "username": None,
+            "full_name": "Test User"
+        })
+        message = make_message("connect")
+        
+        await engine.handle_incoming_message(message)
+        
+        engine.ab_client.get_user_account_status.assert_called_once_with("user_123")
+        engine.ab_client.generate_link_code.assert_not_called()
+        assert "Test User" in engine.wa_client.send_text_message.call_args[0][1]
+    
+    @pytest.mark.asyncio
+    async def test_signup_status_error_sends_prompt(self, engine, make_message):
+        """Test signup still shows the signup prompt when the status lookup fails."""
+        engine.ab_client.get_user_account_status = AsyncMock(
+            side_effect=AlphaBoardClientError("Database error: timeout")
+        )
+        message = make_message("signup")
+        
+        await engine.handle_incoming_message(message)
+        
+        assert engine.wa_client.send_text_message.call_args[0][1] == Templates.SIGNUP_PROMPT
+    
+    def test_parse_ticker_price(self, engine):
+        """Test flow ticker/price parsing and ticker validation."""
+        assert engine._parse_ticker_price("tcs @ 3400") == ("TCS", 3400.0)
+        assert engine._parse_ticker_price("RELIANCE.NS") == ("RELIANCE.NS", None)
+        assert engine._parse_ticker_price("T") is None
+        assert engine._parse_ticker_price("TCS.NSE") is None
+        assert engine._parse_ticker_price("TC5") is None
+    
+    def test_format_inr(self):
+        """Test rupee formatting matches the inline format it replaced."""
+        assert format_inr(1234567.4) == "₹1,234,567"
+        assert format_inr(3400) == "₹3,400"
+    
     @pytest.mark.asyncio
     async def test_interactive_watchlist_menu(self, engine, make_message):
         """Test interactive menu selection for watchlist."""
@@ -195,6 +314,52 @@ class TestMessageEngine:
         
         engine.ab_client.list_watchlist.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_interactive_analyst_status(self, engine, make_message):
+        """Test analyst_status_ replies are not swallowed by the analyst_ prefix."""
+        message = make_message("analyst_status_CLOSED_analyst-uuid", "interactive_button")
+        
+        with patch.object(engine, '_handle_show_analyst_recs', new_callable=AsyncMock) as mock_show:
+            await engine.handle_incoming_message(message)
+        
+        mock_show.assert_called_once_with("919876543210", "user_123", "analyst-uuid", "CLOSED")
+    
+    @pytest.mark.asyncio
+    async def test_analyst_recs_prefetch_after_access_check(self, engine):
+        """Test analyst data is only prefetched once access is confirmed, keyed by the profile UUID."""
+        analyst_id = "6F1C2A3B-0000-4000-8000-00000000ABCD"
+        engine.ab_client.get_profile = AsyncMock(return_value={
+            "id": analyst_id.lower(), "username": "analyst", "organization_id": "org_other"
+        })
+        engine.ab_client.prefetch_analyst_bundle = AsyncMock()
+        context = MagicMock()
+        context.data = {"organization_id": "org_admin"}
+        
+        with patch('src.engine.state_manager.get_context', new_callable=AsyncMock, return_value=context):
+            await engine._handle_show_analyst_recs("919876543210", "user_123", analyst_id, "OPEN")
+            
+            engine.ab_client.prefetch_analyst_bundle.assert_not_called()
+            assert "Access Denied" in engine.wa_client.send_text_message.call_args[0][1]
+            
+            # Same organization: stop right after the prefetch is started
+            context.data = {"organization_id": "org_other"}
+            engine.ab_client.prefetch_analyst_bundle.side_effect = RuntimeError("stop")
+            await engine._handle_show_analyst_recs("919876543210", "user_123", analyst_id, "OPEN")
+        
+        prefetch_args = engine.ab_client.prefetch_analyst_bundle.call_args[0]
+        assert prefetch_args[:2] == (analyst_id.lower(), "OPEN")
+    
+    @pytest.mark.asyncio
+    async def test_track_all_org_requires_active_flow(self, engine, make_message):
+        """Test a stale 'All Analysts' reply does not re-run the admin check."""
+        engine.ab_client.check_user_is_admin = AsyncMock()
+        message = make_message("track_all_org", "interactive_list")
+        
+        await engine.handle_incoming_message(message)
+        
+        engine.ab_client.check_user_is_admin.assert_not_called()
+        engine.ab_client.get_organization_members.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_fallback_unknown_command(self, engine, make_message):
         """Test fallback for unknown command."""
@@ -0,0 +1,100 @@
+"""
+Tests for the market report service.
+"""
+
+import asyncio
+import time
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, patch, MagicMock
+
+from src.services import market_reports
+from src.services.market_reports import MarketReportService
+
+
+MARKET_DATA = (
+    {"^NSEI": {"name": "NIFTY 50", "price": 22000.0, "change": 110.0, "change_pct": 0.5}},
+    {"gainers": [], "losers": []}
+)
+
+
+class TestMarketDataCache:
+    """Tests for the shared market data cache."""
+    
+    @pytest.fixture
+    def service(self, test_settings):
+        """Create a market report service with an empty shared cache."""
+        with patch.object(market_reports, '_market_data', None), \
+             patch.object(market_reports, '_market_data_task', None):
+            yield MarketReportService(test_settings)
+    
+    @pytest.mark.asyncio
+    async def test_fresh_data_served_from_cache(self, service):
+        """Test fresh data is returned without fetching."""
+        market_reports._market_data = (time.monotonic(), date.today(), MARKET_DATA)
+        
+        with patch.object(service, '_fetch_market_data', new_callable=AsyncMock) as mock_fetch:
+            assert await service._get_market_data() == MARKET_DATA
+        
+        mock_fetch.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_stale_data_served_with_one_refresh(self, service):
+        """Test stale data is returned at once while a single refresh runs."""
+        stale_at = time.monotonic() - market_reports.MARKET_DATA_FRESH_SECONDS - 1
+        market_reports._market_data = (stale_at, date.today(), MARKET_DATA)
+        
+        with patch.object(service, '_fetch_market_data', new_callable=AsyncMock) as mock_fetch:
+            assert await service._get_market_data() == MARKET_DATA
+            assert await service._get_market_data() == MARKET_DATA
+            await market_reports._market_data_task
+        
+        mock_fetch.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_callers_share_fetch(self, service):
+        """Test concurrent misses wait on one fetch."""
+        async def slow_indices():
+            await asyncio.sleep(0.01)
+            return MARKET_DATA[0]
+        
+        with patch.object(service, '_fetch_indices_data', side_effect=slow_indices) as mock_indices, \
+             patch.object(service, '_fetch_top_movers', new_callable=AsyncMock, return_value=MARKET_DATA[1]):
+            first, second = await asyncio.gather(
+                service._get_market_data(),
+                service._get_market_data()
+            )
+        
+        assert first == second == MARKET_DATA
+        mock_indices.assert_called_once()
+        assert market_reports._market_data[2] == MARKET_DATA
+    
+    @pytest.mark.asyncio
+    async def test_failed_indices_not_cached(self, service):
+        """Test a fetch where every index failed is returned but not cached."""
+        http_client = MagicMock()
+        http_client.get = AsyncMock(side_effect=Exception("backend down"))
+        
+        with patch('src.services.market_reports.get_http_client', return_value=http_client):
+            indices, _ = await service._get_market_data()
+        
+        assert indices == {}
+        assert market_reports._market_data is None
+        assert http_client.get.call_count == len(MarketReportService.INDICES)
+    
+    @pytest.mark.asyncio
+    async def test_refresh_survives_closed_service(self, service):
+        """Test a shared fetch still works after the instance that started it is closed."""
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"regularMarketPrice": 100.0, "regularMarketChange": 1.0, "regularMarketChangePercent": 1.0}
+        http_client = MagicMock()
+        http_client.get = AsyncMock(return_value=response)
+        
+        with patch('src.services.market_reports.get_http_client', return_value=http_client):
+            task = service._refresh_market_data()
+            await service.close()
+            indices, _ = await task
+        
+        assert len(indices) == len(MarketReportService.INDICES)
+        assert market_reports._market_data is not None
@@ -0,0 +1,65 @@
+"""
+Tests for the news service.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+
+from src.lookup_cache import InMemoryLookupCache
+from src.services import news_service
+from src.services.news_service import NewsService
+
+
+class TestFinnhubCache:
+    """Tests for the Finnhub news cache."""
+    
+    @pytest.fixture
+    def http_client(self):
+        """Create a mock shared HTTP client returning one Finnhub article."""
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = [
+            {"headline": "Apple beats estimates", "url": "https://www.reuters.com/a", "source": "Reuters", "datetime": 1700000000}
+        ]
+        client = MagicMock()
+        client.get = AsyncMock(return_value=response)
+        
+        with patch.object(news_service, '_finnhub_news_cache', InMemoryLookupCache(900)), \
+             patch.object(news_service, '_finnhub_news_pending', {}), \
+             patch('src.services.news_service.get_http_client', return_value=client):
+            yield client
+    
+    @pytest.mark.asyncio
+    async def test_repeat_lookup_served_from_cache(self, http_client):
+        """Test a second lookup within the TTL skips the HTTP request."""
+        service = NewsService(finnhub_api_key="test_key")
+        
+        first = await service._fetch_from_finnhub("AAPL")
+        second = await service._fetch_from_finnhub("AAPL")
+        
+        assert first == second
+        assert second[0]["headline"] == "Apple beats estimates"
+        http_client.get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_request(self, http_client):
+        """Test concurrent misses for the same ticker wait on one request."""
+        service = NewsService(finnhub_api_key="test_key")
+        response = http_client.get.return_value
+        
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return response
+        
+        http_client.get.side_effect = slow_get
+        
+        first, second = await asyncio.gather(
+            service._fetch_from_finnhub("AAPL"),
+            service._fetch_from_finnhub("AAPL")
+        )
+        
+        assert first == second
+        assert first is not second
+        http_client.get.assert_called_once()
+        assert news_service._finnhub_news_pending == {}
@@ -75,6 +75,17 @@ class TestWebhookIncoming:
         assert response.status_code == 200
         assert response.json() == {"status": "EVENT_RECEIVED"}
     
+    def test_webhook_post_schedules_parsed_message(self, client, sample_webhook_payload):
+        """Test the raw body is parsed into a message for the engine."""
+        with patch('src.webhook.process_message_async', new_callable=AsyncMock) as mock_process:
+            client.post("/webhook", json=sample_webhook_payload)
+        
+        mock_process.assert_called_once()
+        parsed = mock_process.call_args[0][0]
+        assert parsed.sender_phone == "919876543210"
+        assert parsed.text_body == "add TCS"
+        assert parsed.phone_number_id == "123456789"
+    
     def test_webhook_post_non_whatsapp(self, client):
         """Test webhook ignores non-WhatsApp events."""
         payload = {
@@ -135,3 +146,16 @@ class TestWebhookIncoming:
         assert response.status_code == 200
         assert response.json() == {"status": "EVENT_RECEIVED"}
 
+
+class TestHealth:
+    """Tests for health check endpoints."""
+    
+    def test_health_endpoints(self, client):
+        """Test the pre-encoded health bodies are served as JSON."""
+        assert client.get("/").json()["status"] == "ok"
+        
+        response = client.get("/health")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"status": "healthy"}